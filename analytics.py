@@ -0,0 +1,198 @@
+"""
+analytics.py
+This file grades mazes with NumPy: dead ends, junctions, longest corridor, straightness and solution length.
+The mazes of a batch are stacked into one (count, height, width) array of walls, and every metric is computed
+for the whole batch at once from shifted copies of the array (the 4 neighbours of every cell), so there is no
+Python loop over the cells. It needs numpy, the game itself doesn't.
+
+usage: python analytics.py --count 1000 --size 43 [--seed 0] [--input mazes.bin] [--output stats.json]
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+from maze import Maze
+from maze_file import MazeFile, BitGrid
+
+METRICS = ["dead_ends", "junctions", "longest_corridor", "straightness", "solution_length"]
+
+
+def grid_array(grid, height, width):
+    """
+    :param grid: Maze.grid, or the BitGrid of a maze file
+    :param height: int, number of rows
+    :param width: int, number of cells in a row
+    :return: numpy array of bool, (height, width), True for walls
+    """
+    if isinstance(grid, BitGrid):
+        packed = np.frombuffer(grid.buffer, dtype=np.uint8).reshape(height, grid.row_bytes)
+        return np.unpackbits(packed, axis=1)[:, :width].astype(bool)
+    return np.frombuffer(bytes(grid), dtype=np.uint8).reshape(height, width) == Maze.WALL_CELL
+
+
+def stack(mazes):
+    """
+    :param mazes: Maze class object, or list of Maze class objects of the same size
+    :return: numpy array of bool, (count, size, size), True for walls
+    """
+    if isinstance(mazes, Maze):
+        mazes = [mazes]
+    sizes = {maze.size for maze in mazes}
+    if len(sizes) != 1:
+        raise ValueError("mazes of a batch must have the same size")
+    return np.stack([grid_array(maze.grid, maze.size, maze.size) for maze in mazes])
+
+
+def neighbours(paths):
+    """
+    :param paths: numpy array of bool, (count, height, width), True for path cells
+    :return: 4 numpy arrays of bool, (count, height, width): is the cell above, below, on the left,
+             on the right a path (False outside the maze)
+    """
+    up = np.zeros_like(paths)
+    down = np.zeros_like(paths)
+    left = np.zeros_like(paths)
+    right = np.zeros_like(paths)
+    up[:, 1:, :] = paths[:, :-1, :]
+    down[:, :-1, :] = paths[:, 1:, :]
+    left[:, :, 1:] = paths[:, :, :-1]
+    right[:, :, :-1] = paths[:, :, 1:]
+    return up, down, left, right
+
+
+def longest_run(walls):
+    """
+    longest run of path cells along the rows of every maze
+    every row starts and ends with a wall of the frame, so runs never go from a row (or a maze) to the next one
+    :param walls: numpy array of bool, (count, height, width), True for walls
+    :return: numpy array of int, (count,)
+    """
+    count, height, width = walls.shape
+    wall_positions = np.flatnonzero(walls)
+    runs = np.diff(wall_positions) - 1
+    longest = np.zeros(count, dtype=np.int64)
+    # a run belongs to the maze of the wall it starts after
+    np.maximum.at(longest, wall_positions[:-1] // (height * width), runs)
+    return longest
+
+
+def solution_length(paths, start, goal):
+    """
+    number of steps of the shortest path from start to goal in every maze, by growing the cells reached from start
+    one step at a time on the whole batch
+    :param paths: numpy array of bool, (count, height, width), True for path cells
+    :param start: (i, j), start cell
+    :param goal: (i, j), goal cell
+    :return: numpy array of int, (count,), -1 where goal can't be reached
+    """
+    reached = np.zeros_like(paths)
+    reached[:, start[0], start[1]] = paths[:, start[0], start[1]]
+    lengths = np.where(reached[:, goal[0], goal[1]], 0, -1)
+    steps = 0
+    while True:
+        grown = reached.copy()
+        grown[:, 1:, :] |= reached[:, :-1, :]
+        grown[:, :-1, :] |= reached[:, 1:, :]
+        grown[:, :, 1:] |= reached[:, :, :-1]
+        grown[:, :, :-1] |= reached[:, :, 1:]
+        grown &= paths
+        steps += 1
+        arrived = grown[:, goal[0], goal[1]] & (lengths == -1)
+        lengths[arrived] = steps
+        # stop once every maze got to the goal or can't grow anymore
+        if (lengths != -1).all() or (grown == reached).all():
+            return lengths
+        reached = grown
+
+
+def analyze(walls):
+    """
+    grade a batch of mazes
+    dead end: path cell with 1 path neighbour, junction: path cell with 3 or 4,
+    straightness: share of the corridor cells (2 path neighbours) where the corridor goes straight on,
+    longest corridor: longest straight run of path cells, along rows or columns,
+    solution length: steps from the top left cell to the bottom right cell
+    :param walls: numpy array of bool, (count, height, width), True for walls, see stack
+    :return: dict, metric name -> numpy array, (count,), one value per maze
+    """
+    count, height, width = walls.shape
+    paths = ~walls
+    up, down, left, right = neighbours(paths)
+    degree = up.astype(np.int8) + down + left + right
+    corridors = paths & (degree == 2)
+    straight = corridors & ((up & down) | (left & right))
+    corridor_cells = corridors.sum(axis=(1, 2))
+    return {"dead_ends": (paths & (degree == 1)).sum(axis=(1, 2)),
+            "junctions": (paths & (degree >= 3)).sum(axis=(1, 2)),
+            "longest_corridor": np.maximum(longest_run(walls),
+                                           longest_run(np.ascontiguousarray(walls.transpose(0, 2, 1)))),
+            "straightness": straight.sum(axis=(1, 2)) / np.maximum(corridor_cells, 1),
+            "solution_length": solution_length(paths, (1, 1), (height - 2, width - 2))}
+
+
+def summarize(metrics):
+    """
+    summary statistics of a batch
+    :param metrics: dict, result of analyze
+    :return: dict, metric name -> dict of mean, std, min, p5, median, p95, max
+    """
+    summary = {}
+    for name, values in metrics.items():
+        values = np.asarray(values, dtype=float)
+        summary[name] = {"mean": float(values.mean()),
+                         "std": float(values.std()),
+                         "min": float(values.min()),
+                         "p5": float(np.percentile(values, 5)),
+                         "median": float(np.median(values)),
+                         "p95": float(np.percentile(values, 95)),
+                         "max": float(values.max())}
+    return summary
+
+
+def load_file(path):
+    """
+    stack all the mazes of a binary maze file, they must have the same size
+    :param path: str, path of the file
+    :return: numpy array of bool, (count, height, width), True for walls
+    """
+    with MazeFile(path) as mazes:
+        shapes = {(mazes.header(k)["height"], mazes.header(k)["width"]) for k in range(len(mazes))}
+        if len(shapes) != 1:
+            raise ValueError("mazes of a batch must have the same size")
+        height, width = shapes.pop()
+        return np.stack([grid_array(mazes.grid(k), height, width) for k in range(len(mazes))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="grade a batch of mazes")
+    parser.add_argument("--count", type=int, default=1000, help="number of mazes to generate")
+    parser.add_argument("--size", type=int, default=43, help="size of the mazes, odd and between 11 and 59")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first maze, maze k uses seed + k")
+    parser.add_argument("--input", default=None, help="grade the mazes of a binary maze file instead")
+    parser.add_argument("--output", default=None, help="save the summary to this JSON file")
+    args = parser.parse_args()
+
+    if args.input:
+        walls = load_file(args.input)
+    else:
+        walls = stack([Maze(args.size, args.seed + k) for k in range(args.count)])
+    start = time.perf_counter()
+    summary = summarize(analyze(walls))
+    elapsed = time.perf_counter() - start
+    print(f"{walls.shape[0]} mazes of {walls.shape[1]} x {walls.shape[2]} graded in {elapsed:.2f}s")
+    print(f"{'metric':>18}{'mean':>10}{'std':>10}{'min':>10}{'median':>10}{'max':>10}")
+    for name in METRICS:
+        stats = summary[name]
+        print(f"{name:>18}{stats['mean']:>10.2f}{stats['std']:>10.2f}{stats['min']:>10.2f}"
+              f"{stats['median']:>10.2f}{stats['max']:>10.2f}")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(summary, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+asset_manager.py
+This file contains AssetManager class, which loads the images and sounds of the game the first time they are used.
+Images are converted to the pixel format of the display once it exists, so blitting them doesn't convert every
+pixel on every frame, and their scaled versions are kept on disk (one folder per BLOCK_SIZE), so the next start
+loads the small images instead of decoding and scaling the large ones again.
+Once build_atlas.py packed the scaled images into one atlas image, they are all read from it at once and handed
+out as subsurfaces of the same surface.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import json
+import os
+import pygame
+from constants import BLOCK_SIZE
+
+
+class SilentSound:
+    """
+    stands in for a sound that can't be loaded (missing file or no audio device), playing it does nothing
+    """
+
+    def play(self, *args, **kwargs):
+        return None
+
+    def stop(self):
+        return None
+
+    def set_volume(self, volume):
+        return None
+
+
+def atlas_key(file, size):
+    """
+    :param file: str, path of an image inside the root folder, "/" separated
+    :param size: (width, height), size of the scaled image
+    :return: str, name of the scaled image in the atlas index
+    """
+    return f"{file}@{size[0]}x{size[1]}"
+
+
+class AssetManager:
+
+    def __init__(self, root="Assets", cache_dir=None, block_size=BLOCK_SIZE):
+        """
+        initialize the manager, nothing is loaded until it is used
+        :param root: str, folder of the asset files
+        :param cache_dir: str, folder of the scaled images, root/.cache/<block_size> if None
+        :param block_size: int, size of a block, the scaled images of different block sizes are kept apart
+        self.images: dict, (file, size) -> converted surface
+        self.sounds: dict, file -> pygame.mixer.Sound (or SilentSound)
+        self.atlas_opaque: set, names (atlas_key) of the atlas images without a transparent pixel
+        """
+        self.root = root
+        self.cache_dir = cache_dir if cache_dir is not None else os.path.join(root, ".cache", str(block_size))
+        self.images = {}
+        self.sounds = {}
+        self.atlas = None
+        self.atlas_converted = False
+        self.atlas_index = None
+        self.atlas_opaque = set()
+
+    @property
+    def atlas_path(self):
+        """
+        :return: str, path of the atlas image, its index is next to it with a .json extension
+        """
+        return os.path.join(self.cache_dir, "atlas.png")
+
+    def path(self, file):
+        """
+        :param file: str, path of an asset inside the root folder, "/" separated
+        :return: str, path of the asset
+        """
+        return os.path.join(self.root, *file.split("/"))
+
+    def cache_path(self, file, size):
+        """
+        :param file: str, path of an asset inside the root folder, "/" separated
+        :param size: (width, height), size of the scaled image
+        :return: str, path of the scaled image in the cache
+        """
+        name = os.path.splitext(file.replace("/", "_"))[0]
+        return os.path.join(self.cache_dir, f"{name}_{size[0]}x{size[1]}.png")
+
+    def image(self, file, size=None):
+        """
+        :param file: str, path of an image inside the root folder, "/" separated
+        :param size: (width, height), size to scale the image to, original size if None
+        :return: pygame.Surface, in the display pixel format if there is a display already
+        """
+        key = (file, tuple(size) if size is not None else None)
+        if key in self.images:
+            return self.images[key]
+        rect = self.atlas_rect(file, size) if size is not None else None
+        if rect is not None and self.load_atlas() is not None:
+            surface = self.atlas.subsurface(rect)
+            if self.atlas_converted:
+                # an image without transparent pixels is copied out without alpha, it blits faster
+                if atlas_key(file, size) in self.atlas_opaque:
+                    surface = surface.convert()
+                self.images[key] = surface
+            return surface
+        surface = self.load_scaled(file, size) if size is not None else pygame.image.load(self.path(file))
+        # converting needs a display, the image is loaded again once there is one
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha() if surface.get_flags() & pygame.SRCALPHA else surface.convert()
+            self.images[key] = surface
+        return surface
+
+    def load_scaled(self, file, size):
+        """
+        load a scaled image from the cache, or scale the original and save it into the cache
+        the cache is only a speed up: it is rebuilt when the original is newer, and skipped if it can't be written
+        :param file: str, path of an image inside the root folder, "/" separated
+        :param size: (width, height), size to scale the image to
+        :return: pygame.Surface
+        """
+        source = self.path(file)
+        cached = self.cache_path(file, size)
+        if os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(source):
+            try:
+                return pygame.image.load(cached)
+            except pygame.error:
+                pass
+        surface = pygame.transform.scale(pygame.image.load(source), size)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            pygame.image.save(surface, cached)
+        except (OSError, pygame.error):
+            pass
+        return surface
+
+    def atlas_rect(self, file, size):
+        """
+        :param file: str, path of an image inside the root folder, "/" separated
+        :param size: (width, height), size of the scaled image
+        :return: (x, y, width, height), where the scaled image is in the atlas, None if it is not in there
+        """
+        if self.atlas_index is None:
+            self.atlas_index = {}
+            try:
+                with open(os.path.splitext(self.atlas_path)[0] + ".json") as index:
+                    data = json.load(index)
+                self.atlas_index = data["images"]
+                self.atlas_opaque = set(data.get("opaque", []))
+            except (OSError, ValueError, KeyError):
+                pass
+        rect = self.atlas_index.get(atlas_key(file, size))
+        if rect is None:
+            return None
+        # an atlas older than the image is out of date, and an index without its atlas image is stale
+        try:
+            if os.path.getmtime(self.path(file)) > os.path.getmtime(self.atlas_path):
+                return None
+        except OSError:
+            self.atlas_index = {}
+            return None
+        return tuple(rect)
+
+    def load_atlas(self):
+        """
+        read the atlas image once, it is converted to the display format on the first use once there is a display
+        :return: pygame.Surface, None if it can't be read
+        """
+        if self.atlas is None:
+            try:
+                self.atlas = pygame.image.load(self.atlas_path)
+            except (OSError, pygame.error):
+                # the images are loaded one by one instead
+                self.atlas_index = {}
+                return None
+        if not self.atlas_converted and pygame.display.get_surface() is not None:
+            self.atlas = self.atlas.convert_alpha()
+            self.atlas_converted = True
+        return self.atlas
+
+    def build_atlas(self, entries, width=None):
+        """
+        pack scaled images into one atlas image, in rows (shelves) filled left to right, tallest images first,
+        and write it with its index into the cache folder
+        :param entries: list of (file, size), images to pack
+        :param width: int, width of the atlas, widened to the widest image, the widest image if None
+        :return: (width, height), size of the atlas
+        """
+        images = [(file, tuple(size), self.load_scaled(file, size)) for file, size in entries]
+        images.sort(key=lambda image: (-image[1][1], -image[1][0], image[0]))
+        width = max([width or 0] + [size[0] for _, size, _ in images])
+        rects = {}
+        x = y = shelf_height = 0
+        for file, size, _ in images:
+            if x + size[0] > width:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+            rects[atlas_key(file, size)] = [x, y, size[0], size[1]]
+            x += size[0]
+            shelf_height = max(shelf_height, size[1])
+        atlas = pygame.Surface((width, y + shelf_height), pygame.SRCALPHA)
+        atlas.blits([(surface, rects[atlas_key(file, size)][:2]) for file, size, surface in images], False)
+        # images without a transparent pixel, handed out without alpha
+        opaque = sorted(atlas_key(file, size) for file, size, surface in images
+                        if not surface.get_flags() & pygame.SRCALPHA
+                        or pygame.mask.from_surface(surface, 254).count() == size[0] * size[1])
+        os.makedirs(self.cache_dir, exist_ok=True)
+        pygame.image.save(atlas, self.atlas_path)
+        with open(os.path.splitext(self.atlas_path)[0] + ".json", "w") as index:
+            json.dump({"size": atlas.get_size(), "images": rects, "opaque": opaque}, index, indent=2)
+        self.atlas = None
+        self.atlas_converted = False
+        self.atlas_index = None
+        self.atlas_opaque = set()
+        return atlas.get_size()
+
+    def sound(self, file):
+        """
+        :param file: str, path of a sound inside the root folder, "/" separated
+        :return: pygame.mixer.Sound, or SilentSound if it can't be loaded
+        """
+        if file not in self.sounds:
+            try:
+                self.sounds[file] = pygame.mixer.Sound(self.path(file))
+            except (FileNotFoundError, pygame.error):
+                self.sounds[file] = SilentSound()
+        return self.sounds[file]
+
+    def clear_cache(self):
+        """
+        delete the scaled images and the atlas of this block size from the disk
+        :return: None
+        """
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                os.remove(os.path.join(self.cache_dir, name))
+        self.atlas = None
+        self.atlas_converted = False
+        self.atlas_index = None
+        self.atlas_opaque = set()
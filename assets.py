@@ -1,13 +1,15 @@
 """
 assets.py
 This file is responsible for storing all constants and loading all the assets.
+Images and sounds are loaded the first time they are used, as attributes of the module (assets.path_view),
+through AssetManager (asset_manager.py).
 
 Author: Allyn Bao
-Date last modified: 9/9/2021
+Date last modified: 10/17/2026
 """
 
 import pygame
-import os
+from asset_manager import AssetManager
 
 pygame.font.init()
 pygame.mixer.init()
@@ -15,18 +17,8 @@ pygame.mixer.init()
 """
 Constants
 """
-# parameters
-LEN = 550
-MAZE_SIZE = 43
-BLOCK_SIZE = LEN // 11
-CHARACTER_PADDING = BLOCK_SIZE // 6
-FPS = 90
-TIME = 1  # min
-TREAS_DENSITY = 10  # a unit of treasure in # x # of blocks
-TREAS_PADDING = MAZE_SIZE % TREAS_DENSITY - 1
-TREAS_NUM_PER_ROW = (MAZE_SIZE - TREAS_PADDING) // TREAS_DENSITY
-SPEED = int(BLOCK_SIZE * 0.08)
-GARD_SPEED = int(BLOCK_SIZE * 0.1)
+# parameters (shared with the headless game core)
+from constants import *
 
 # keyboard
 START_KEY = pygame.K_SPACE
@@ -49,57 +41,63 @@ FINAL_FONT = pygame.font.SysFont("San Francisco", FINAL_FONT_SIZE)
 ADDITIONAL_FONT = pygame.font.SysFont("San Francisco", FINAL_FONT_SIZE // 2)
 PAST_SCORE_FONT = pygame.font.SysFont("San Francisco", FINAL_FONT_SIZE // 3)
 
-# images
-GUIDE_IMG = pygame.image.load(os.path.join("Assets", "startGuide.png"))
-PATH_IMG = pygame.image.load(os.path.join("Assets", "grassPath.png"))
-WALL_IMG = pygame.image.load(os.path.join("Assets", "mossyGreenBrick.png"))
-TRAP_WALL_IMG = pygame.image.load(os.path.join("Assets", "circularSaw.png"))
-TREAS_IMG = pygame.image.load(os.path.join("Assets", "magicStone.png"))
-BAR_IMG = pygame.image.load(os.path.join("Assets", "greenBottomBar.png"))
-BACKGROUND_IMG = pygame.image.load(os.path.join("Assets", "blurBackground.png"))
-REPLAY_IMG = pygame.image.load(os.path.join("Assets", "replayButton.png"))
-QUIT_IMG = pygame.image.load(os.path.join("Assets", "quitButton.png"))
-PRESSED_REPLAY_IMG = pygame.image.load(os.path.join("Assets", "pressedReplayButton.png"))
-PRESSED_QUIT_IMG = pygame.image.load(os.path.join("Assets", "pressedQuitButton.png"))
-# player img
-PLAYER_IMG_LIST = []
-# up
-PLAYER_IMG_1 = pygame.image.load(os.path.join("Assets", "player_img", "player_up_1.png"))
-PLAYER_IMG_2 = pygame.image.load(os.path.join("Assets", "player_img", "player_up_still.png"))
-PLAYER_IMG_3 = pygame.image.load(os.path.join("Assets", "player_img", "player_up_2.png"))
-PLAYER_IMG_LIST.append([PLAYER_IMG_1, PLAYER_IMG_2, PLAYER_IMG_3, PLAYER_IMG_2])
-# down
-PLAYER_IMG_4 = pygame.image.load(os.path.join("Assets", "player_img", "player_down_1.png"))
-PLAYER_IMG_5 = pygame.image.load(os.path.join("Assets", "player_img", "player_down_still.png"))
-PLAYER_IMG_6 = pygame.image.load(os.path.join("Assets", "player_img", "player_down_2.png"))
-PLAYER_IMG_LIST.append([PLAYER_IMG_4, PLAYER_IMG_5, PLAYER_IMG_6, PLAYER_IMG_5])
-# left
-PLAYER_IMG_7 = pygame.image.load(os.path.join("Assets", "player_img", "player_left_1.png"))
-PLAYER_IMG_8 = pygame.image.load(os.path.join("Assets", "player_img", "player_left_still.png"))
-PLAYER_IMG_9 = pygame.image.load(os.path.join("Assets", "player_img", "player_left_2.png"))
-PLAYER_IMG_LIST.append([PLAYER_IMG_7, PLAYER_IMG_8, PLAYER_IMG_9, PLAYER_IMG_8])
-# right
-PLAYER_IMG_10 = pygame.image.load(os.path.join("Assets", "player_img", "player_right_1.png"))
-PLAYER_IMG_11 = pygame.image.load(os.path.join("Assets", "player_img", "player_right_still.png"))
-PLAYER_IMG_12 = pygame.image.load(os.path.join("Assets", "player_img", "player_right_2.png"))
-PLAYER_IMG_LIST.append([PLAYER_IMG_10, PLAYER_IMG_11, PLAYER_IMG_12, PLAYER_IMG_11])
-
-# formatted images
-guide_view = pygame.transform.scale(GUIDE_IMG, (BLOCK_SIZE * 11, BLOCK_SIZE * 11))
-path_view = pygame.transform.scale(PATH_IMG, (BLOCK_SIZE, BLOCK_SIZE))
-wall_view = pygame.transform.scale(WALL_IMG, (BLOCK_SIZE, BLOCK_SIZE))
-trap_wall_view = pygame.transform.scale(TRAP_WALL_IMG, (BLOCK_SIZE, BLOCK_SIZE))
-treas_view = pygame.transform.scale(TREAS_IMG, (BLOCK_SIZE, BLOCK_SIZE))
-bar_view = pygame.transform.scale(BAR_IMG, (BLOCK_SIZE * 11, BLOCK_SIZE))
-replay_view = pygame.transform.scale(REPLAY_IMG, (BLOCK_SIZE * 5, BLOCK_SIZE))
-quit_view = pygame.transform.scale(QUIT_IMG, (BLOCK_SIZE * 5, BLOCK_SIZE))
-pressed_replay_view = pygame.transform.scale(PRESSED_REPLAY_IMG, (BLOCK_SIZE * 5, BLOCK_SIZE))
-pressed_quit_view = pygame.transform.scale(PRESSED_QUIT_IMG, (BLOCK_SIZE * 5, BLOCK_SIZE))
-background_view = pygame.transform.scale(BACKGROUND_IMG, (BLOCK_SIZE * 11, BLOCK_SIZE * 12))
+# images, loaded on first use by asset_manager
+# formatted images: name -> (file, size)
+IMAGES = {"guide_view": ("startGuide.png", (BLOCK_SIZE * 11, BLOCK_SIZE * 11)),
+          "path_view": ("grassPath.png", (BLOCK_SIZE, BLOCK_SIZE)),
+          "wall_view": ("mossyGreenBrick.png", (BLOCK_SIZE, BLOCK_SIZE)),
+          "trap_wall_view": ("circularSaw.png", (BLOCK_SIZE, BLOCK_SIZE)),
+          "treas_view": ("magicStone.png", (BLOCK_SIZE, BLOCK_SIZE)),
+          "bar_view": ("greenBottomBar.png", (BLOCK_SIZE * 11, BLOCK_SIZE)),
+          "replay_view": ("replayButton.png", (BLOCK_SIZE * 5, BLOCK_SIZE)),
+          "quit_view": ("quitButton.png", (BLOCK_SIZE * 5, BLOCK_SIZE)),
+          "pressed_replay_view": ("pressedReplayButton.png", (BLOCK_SIZE * 5, BLOCK_SIZE)),
+          "pressed_quit_view": ("pressedQuitButton.png", (BLOCK_SIZE * 5, BLOCK_SIZE)),
+          "background_view": ("blurBackground.png", (BLOCK_SIZE * 11, BLOCK_SIZE * 12))}
+# player img, PLAYER_IMG_LIST[heading direction][posture]: up, down, left, right, scaled to the player size
+PLAYER_IMG_SIZE = (BLOCK_SIZE - 2 * CHARACTER_PADDING, BLOCK_SIZE - 2 * CHARACTER_PADDING)
+PLAYER_IMG_FILES = [["player_img/player_%s_1.png" % direction, "player_img/player_%s_still.png" % direction,
+                     "player_img/player_%s_2.png" % direction, "player_img/player_%s_still.png" % direction]
+                    for direction in ["up", "down", "left", "right"]]
 
 # sound
-START_GAME_SOUND = pygame.mixer.Sound(os.path.join("Assets", "startGame.mp3"))
-COLLECTED_SOUND = pygame.mixer.Sound(os.path.join("Assets", "collected.mp3"))
-TIMES_UP_SOUND = pygame.mixer.Sound(os.path.join("Assets", "timesUp.mp3"))
-PLAYER_KILLED_SOUND = pygame.mixer.Sound(os.path.join("Assets", "playerKilled.mp3"))
-BUTTON_SOUND = pygame.mixer.Sound(os.path.join("Assets", "pushButton.mp3"))
+SOUNDS = {"START_GAME_SOUND": "startGame.mp3",
+          "COLLECTED_SOUND": "collected.mp3",
+          "TIMES_UP_SOUND": "timesUp.mp3",
+          "PLAYER_KILLED_SOUND": "playerKilled.mp3",
+          "BUTTON_SOUND": "pushButton.mp3"}
+
+asset_manager = AssetManager("Assets")
+
+
+def atlas_entries():
+    """
+    :return: list of (file, size), every image of the game, as packed into the atlas by build_atlas.py
+    """
+    entries = list(IMAGES.values())
+    for files in PLAYER_IMG_FILES:
+        for file in files:
+            if (file, PLAYER_IMG_SIZE) not in entries:
+                entries.append((file, PLAYER_IMG_SIZE))
+    return entries
+
+
+def __getattr__(name):
+    """
+    load an image or a sound the first time assets.<name> is used
+    images are kept once they could be converted to the display format, until then they are loaded again
+    :param name: str, name in IMAGES, SOUNDS or PLAYER_IMG_LIST
+    :return: pygame.Surface, list of list of pygame.Surface, or pygame.mixer.Sound
+    """
+    if name in IMAGES:
+        value = asset_manager.image(*IMAGES[name])
+    elif name == "PLAYER_IMG_LIST":
+        value = [[asset_manager.image(file, PLAYER_IMG_SIZE) for file in files] for files in PLAYER_IMG_FILES]
+    elif name in SOUNDS:
+        globals()[name] = asset_manager.sound(SOUNDS[name])
+        return globals()[name]
+    else:
+        raise AttributeError(f"module 'assets' has no attribute '{name}'")
+    if pygame.display.get_surface() is not None:
+        globals()[name] = value
+    return value
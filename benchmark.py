@@ -0,0 +1,295 @@
+"""
+benchmark.py
+This file times the costly parts of the game, so a change that makes them slower shows up:
+    maze:      Maze(size) for every valid size from 11 to 59, with the scaling curve over the number of cells
+    placement: GameState.distribute_treasures and GameState.distribute_trapping_walls on MAZE_SIZE mazes
+    frame:     one frame of the game without a display (SDL dummy video driver): GameState.step (movement,
+               collision, trapping walls), draw_maze and draw_game
+The peak memory of every group is measured with tracemalloc, in a separate run from the timings.
+The results are saved as JSON, and a saved file can be compared with the current run.
+
+usage: python benchmark.py --output bench.json [--compare old_bench.json] [--groups maze placement frame]
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from constants import MAZE_SIZE, MAZE_ORIGIN, BLOCK_SIZE
+from game_state import GameState, PLAYER_START
+from maze import Maze
+from simulate import random_walk_bot
+from tile_index import TileIndex
+
+# every valid maze size
+MAZE_SIZES = list(range(11, 60, 2))
+GROUPS = ["maze", "placement", "frame"]
+
+
+def summarize(times):
+    """
+    :param times: list of float, seconds
+    :return: dict, statistics of the times in milliseconds
+    """
+    times = sorted(times)
+    return {"runs": len(times),
+            "mean_ms": statistics.mean(times) * 1000,
+            "median_ms": statistics.median(times) * 1000,
+            "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))] * 1000,
+            "min_ms": times[0] * 1000}
+
+
+def peak_memory(function, *args):
+    """
+    :param function: function to measure
+    :param args: arguments of the function
+    :return: int, peak of the memory allocated while the function runs, in bytes
+    """
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def scaling_exponent(points):
+    """
+    least squares slope of log(time) over log(cells), 1 means the time grows linearly with the number of cells
+    :param points: list of (cells, seconds)
+    :return: float
+    """
+    xs = [math.log(cells) for cells, _ in points]
+    ys = [math.log(seconds) for _, seconds in points]
+    mean_x = statistics.mean(xs)
+    mean_y = statistics.mean(ys)
+    return (sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+            / sum((x - mean_x) ** 2 for x in xs))
+
+
+def bench_maze(repeat, seed):
+    """
+    time Maze(size) for every valid size
+    :param repeat: int, mazes generated per size
+    :param seed: int, seed of the first maze, maze k of a size uses seed + k
+    :return: dict, results per size and the scaling curve
+    """
+    sizes = {}
+    for size in MAZE_SIZES:
+        times = []
+        for k in range(repeat):
+            start = time.perf_counter()
+            Maze(size, seed + k)
+            times.append(time.perf_counter() - start)
+        result = summarize(times)
+        result["cells"] = size * size
+        result["us_per_cell"] = result["median_ms"] * 1000 / (size * size)
+        result["peak_memory"] = peak_memory(Maze, size, seed)
+        sizes[str(size)] = result
+    points = [(result["cells"], result["median_ms"] / 1000) for result in sizes.values()]
+    return {"sizes": sizes, "scaling_exponent": scaling_exponent(points)}
+
+
+def bench_placement(repeat, seed):
+    """
+    time the treasure and trapping wall placement of a round
+    both run again on a state built by GameState, after clearing what it had placed
+    :param repeat: int, number of rounds
+    :param seed: int, seed of the first round, round k uses seed + k
+    :return: dict, results of distribute_treasures and distribute_trapping_walls
+    """
+    def reset_treasures(state):
+        state.treasure_list = []
+        state.treasure_index = TileIndex(MAZE_ORIGIN, BLOCK_SIZE)
+
+    def reset_trap_walls(state):
+        state.trap_wall_list = []
+        state.trap_wall_moving_dir = []
+        state.trap_wall_index = TileIndex(MAZE_ORIGIN, BLOCK_SIZE)
+
+    def place(state):
+        reset_treasures(state)
+        reset_trap_walls(state)
+        state.distribute_trapping_walls(state.distribute_treasures())
+
+    treasure_times = []
+    trap_wall_times = []
+    for k in range(repeat):
+        state = GameState(Maze(MAZE_SIZE, seed + k))
+        reset_treasures(state)
+        reset_trap_walls(state)
+        start = time.perf_counter()
+        treasure_positions = state.distribute_treasures()
+        middle = time.perf_counter()
+        state.distribute_trapping_walls(treasure_positions)
+        end = time.perf_counter()
+        treasure_times.append(middle - start)
+        trap_wall_times.append(end - middle)
+    state = GameState(Maze(MAZE_SIZE, seed))
+    return {"maze_size": MAZE_SIZE,
+            "distribute_treasures": summarize(treasure_times),
+            "distribute_trapping_walls": summarize(trap_wall_times),
+            "peak_memory": peak_memory(place, state)}
+
+
+def bench_frame(frames, seed):
+    """
+    time the frames of a round played by the random walk bot, without a display
+    :param frames: int, number of frames
+    :param seed: int, seed of the maze and the bot
+    :return: dict, results of the step, draw_maze and draw_game parts of a frame
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import main as game
+    from camera import Camera
+
+    def play(frames, draw, times=None, part=None):
+        state = GameState(Maze(MAZE_SIZE, seed))
+        game.last_frame.clear()
+        game.bake_static_layer(state)
+        camera = Camera(game.LEN, game.LEN)
+        player = random_walk_bot(random.Random(seed))
+        player_view = game.assets.PLAYER_IMG_LIST[state.player_heading_dir][1]
+        for _ in range(frames):
+            # start a new round when the last one is over, a frame of the score page is not what is measured
+            if state.game_over:
+                state = GameState(Maze(MAZE_SIZE, state.maze.seed + 1))
+                game.last_frame.clear()
+                game.bake_static_layer(state)
+            start = time.perf_counter()
+            state.step(player(state))
+            camera.follow(state.player, PLAYER_START, PLAYER_START)
+            stepped = time.perf_counter()
+            draw(state, player_view, camera)
+            end = time.perf_counter()
+            if times is not None:
+                times["step"].append(stepped - start)
+                times[part].append(end - stepped)
+
+    # the same frames are played twice: draw_game is a whole frame, draw_maze (a part of it) is timed on its own
+    times = {"step": [], "draw_game": []}
+    play(frames, game.draw_game, times, "draw_game")
+    maze_times = {"step": [], "draw_maze": []}
+    play(frames, game.draw_maze, maze_times, "draw_maze")
+    times["draw_maze"] = maze_times["draw_maze"]
+    result = {name: summarize(part) for name, part in times.items()}
+    frame_times = [step + draw for step, draw in zip(times["step"], times["draw_game"])]
+    result["frame"] = summarize(frame_times)
+    result["frames"] = frames
+    result["video_driver"] = os.environ["SDL_VIDEODRIVER"]
+    result["peak_memory"] = peak_memory(play, min(frames, 500), game.draw_game)
+    return result
+
+
+def git_commit():
+    """
+    :return: str, commit of the working tree, None if it is not known
+    """
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return output.stdout.strip() or None
+
+
+def run(groups, repeat, frames, seed):
+    """
+    :param groups: list of str, names of the groups in GROUPS to run
+    :param repeat: int, runs per measurement of the maze and placement groups
+    :param frames: int, frames of the frame group
+    :param seed: int, seed of the first maze
+    :return: dict, results
+    """
+    results = {"commit": git_commit(),
+               "python": platform.python_version(),
+               "platform": platform.platform(),
+               "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+               "seed": seed}
+    if "maze" in groups:
+        results["maze"] = bench_maze(repeat, seed)
+    if "placement" in groups:
+        results["placement"] = bench_placement(repeat, seed)
+    if "frame" in groups:
+        results["frame"] = bench_frame(frames, seed)
+    return results
+
+
+def report(results, baseline=None):
+    """
+    print the results, with the change from the baseline when there is one
+    :param results: dict, results of run()
+    :param baseline: dict, results of an earlier run, None to skip the comparison
+    :return: None
+    """
+    def change(*keys):
+        old = baseline
+        new = results
+        for key in keys:
+            old = old.get(key, {}) if isinstance(old, dict) else {}
+            new = new[key]
+        # no change to show against a missing, zero or non numeric baseline
+        if not isinstance(old, (int, float)) or old == 0:
+            return ""
+        return f" ({(new - old) / old:+.1%})"
+
+    print(f"commit {results['commit']}, python {results['python']}, {results['platform']}")
+    if baseline is not None:
+        print(f"compared with commit {baseline.get('commit')}")
+    if "maze" in results:
+        print("\nmaze generation")
+        print(f"{'size':>6}{'cells':>8}{'median ms':>12}{'us/cell':>10}{'peak KiB':>10}")
+        for size, result in results["maze"]["sizes"].items():
+            print(f"{size:>6}{result['cells']:>8}{result['median_ms']:>12.3f}{result['us_per_cell']:>10.3f}"
+                  f"{result['peak_memory'] / 1024:>10.1f}{change('maze', 'sizes', size, 'median_ms')}")
+        print(f"time ~ cells ^ {results['maze']['scaling_exponent']:.2f}")
+    if "placement" in results:
+        print(f"\nplacement on size {results['placement']['maze_size']}")
+        for name in ["distribute_treasures", "distribute_trapping_walls"]:
+            result = results["placement"][name]
+            print(f"{name:>26}: median {result['median_ms']:.3f} ms, p95 {result['p95_ms']:.3f} ms"
+                  f"{change('placement', name, 'median_ms')}")
+        print(f"{'peak memory':>26}: {results['placement']['peak_memory'] / 1024:.1f} KiB")
+    if "frame" in results:
+        print(f"\nframe ({results['frame']['frames']} frames, {results['frame']['video_driver']} video driver)")
+        for name in ["step", "draw_maze", "draw_game", "frame"]:
+            result = results["frame"][name]
+            print(f"{name:>26}: median {result['median_ms']:.3f} ms, p95 {result['p95_ms']:.3f} ms"
+                  f"{change('frame', name, 'median_ms')}")
+        print(f"{'peak memory':>26}: {results['frame']['peak_memory'] / 1024:.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time maze generation, placement and frames")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=GROUPS, help="groups to run")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per maze size and placement")
+    parser.add_argument("--frames", type=int, default=2000, help="frames of the frame group")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first maze")
+    parser.add_argument("--output", default=None, help="save the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="JSON file of an earlier run to compare with")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    results = run(args.groups, args.repeat, args.frames, args.seed)
+    report(results, baseline)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"\nsaved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
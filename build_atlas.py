@@ -0,0 +1,39 @@
+"""
+build_atlas.py
+This file is the build step of the texture atlas: it scales every tile and character image of the game to the size
+it is drawn at, packs them into one atlas image and writes it next to its JSON index (name -> rectangle) in the
+asset cache, where AssetManager finds it. The game then reads a single image at start up instead of one per sprite.
+Run it again after changing an image or BLOCK_SIZE, an atlas older than an image is ignored until then.
+
+usage: python build_atlas.py [--width 550]
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import argparse
+import os
+import time
+import pygame
+from assets import asset_manager, atlas_entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pack the game images into one texture atlas")
+    parser.add_argument("--width", type=int, default=None,
+                        help="width of the atlas, widened to the widest image (default: the widest image)")
+    args = parser.parse_args()
+
+    entries = atlas_entries()
+    start = time.perf_counter()
+    width, height = asset_manager.build_atlas(entries, args.width)
+    elapsed = time.perf_counter() - start
+    used = sum(size[0] * size[1] for _, size in entries)
+    print(f"{len(entries)} images packed into {width} x {height} ({used / (width * height):.0%} used) "
+          f"in {elapsed:.2f}s")
+    print(f"written to {asset_manager.atlas_path} ({os.path.getsize(asset_manager.atlas_path) / 1024:.0f} KiB)")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
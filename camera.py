@@ -0,0 +1,79 @@
+"""
+camera.py
+This file contains Camera class, which keeps track of the part of the world shown on screen.
+The maze elements stay at fixed world coordinates, the camera offset is only applied when drawing.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+
+class Camera:
+
+    def __init__(self, width, height, x=0, y=0):
+        """
+        initialize the camera
+        :param width: int, width of the view on screen
+        :param height: int, height of the view on screen
+        :param x: int, world x coordinate shown at the left edge of the screen
+        :param y: int, world y coordinate shown at the top edge of the screen
+        """
+        self.width = width
+        self.height = height
+        self.x = x
+        self.y = y
+
+    def move(self, dx, dy):
+        """
+        move the camera through the world
+        :param dx: int, distance on x
+        :param dy: int, distance on y
+        :return: None
+        """
+        self.x += dx
+        self.y += dy
+
+    def follow(self, rect, x, y):
+        """
+        move the camera so a world rect shows up at a fixed place on screen
+        :param rect: pygame.Rect (or any object with x and y), position in world space
+        :param x: int, x on screen
+        :param y: int, y on screen
+        :return: None
+        """
+        self.x = rect.x - x
+        self.y = rect.y - y
+
+    def apply(self, rect):
+        """
+        convert the position of a world rect into screen coordinates
+        :param rect: pygame.Rect (or any object with x and y), position in world space
+        :return: (x, y), position on screen
+        """
+        return rect.x - self.x, rect.y - self.y
+
+    def to_world(self, x, y):
+        """
+        convert a screen position into world coordinates
+        :param x: int, x on screen
+        :param y: int, y on screen
+        :return: (x, y), position in world space
+        """
+        return x + self.x, y + self.y
+
+    @property
+    def view_rect(self):
+        """
+        the part of the world visible on screen
+        :return: (x, y, width, height) in world space
+        """
+        return self.x, self.y, self.width, self.height
+
+    def is_visible(self, rect):
+        """
+        check if a world rect overlaps the view
+        :param rect: pygame.Rect (or any object with x, y, width and height), position in world space
+        :return: True if any part of rect is on screen
+        """
+        return (rect.x < self.x + self.width and self.x < rect.x + rect.width
+                and rect.y < self.y + self.height and self.y < rect.y + rect.height)
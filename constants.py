@@ -0,0 +1,39 @@
+"""
+constants.py
+This file is responsible for storing the game parameters that don't depend on pygame,
+so the game logic can run without a display. assets.py re-exports all of them.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+# parameters
+LEN = 550
+MAZE_SIZE = 43
+BLOCK_SIZE = LEN // 11
+MAZE_ORIGIN = 4 * BLOCK_SIZE  # world position of the top left corner of the maze
+CHARACTER_PADDING = BLOCK_SIZE // 6
+FPS = 90  # steps of the round per second of game time
+RENDER_FPS = FPS  # max frames drawn per second, 0 for no cap, the game speed doesn't depend on it
+MAX_FRAME_STEPS = FPS // 4  # max steps caught up in one frame, a longer stall is dropped
+TIME = 1  # min
+TREAS_DENSITY = 10  # a unit of treasure in # x # of blocks
+TREAS_SPACING = 2  # min number of cells between 2 treasures
+TREAS_PADDING = MAZE_SIZE % TREAS_DENSITY - 1
+TREAS_NUM_PER_ROW = (MAZE_SIZE - TREAS_PADDING) // TREAS_DENSITY
+SPEED = int(BLOCK_SIZE * 0.08)
+GARD_SPEED = int(BLOCK_SIZE * 0.1)
+# longest tour over all the treasures a layout may need, in cells: as far as the player walks in a round,
+# and the number of layouts drawn before the last one is kept anyway
+MAX_TOUR = TIME * 60 * FPS * SPEED // BLOCK_SIZE
+LAYOUT_ATTEMPTS = 20
+DIRTY_RECTS = True  # only send the changed regions of the window to the display, instead of the whole window
+# distance a trapping wall moves on each step of its motion cycle, it slides out and back by the same distance
+TRAP_WALL_MOTION = [0, 0, -(BLOCK_SIZE // 4), -(BLOCK_SIZE // 4), -(BLOCK_SIZE // 4), -(BLOCK_SIZE // 4) - 2,
+                    0, 0, (BLOCK_SIZE // 4), (BLOCK_SIZE // 4), (BLOCK_SIZE // 4), (BLOCK_SIZE // 4) + 2]
+TRAP_WALL_REACH = -sum(motion for motion in TRAP_WALL_MOTION if motion < 0)
+# exploration mode: number of cells on a side of a chunk (even), openings on each border of a chunk,
+# and memory cap of the chunks kept
+CHUNK_SIZE = 20
+CHUNK_OPENINGS = 2
+CHUNK_CACHE_BYTES = 256 * 1024
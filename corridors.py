@@ -0,0 +1,98 @@
+"""
+corridors.py
+This file contains CorridorTable class, the run lengths of the corridors of a maze.
+For every cell it keeps how many path cells there are from the cell to the nearest wall in each direction,
+so "how long is this corridor" is answered with a lookup instead of walking the maze cell by cell.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+from array import array
+from functools import lru_cache
+from maze import Maze
+
+_WALL_BYTE = bytes([Maze.WALL_CELL])
+
+
+@lru_cache(maxsize=None)
+def segment_runs(length):
+    """
+    run lengths of a corridor segment followed by a wall, the same for every segment of that length
+    :param length: int, number of path cells of the segment
+    :return: array, array: run lengths towards the start and towards the end of the line, the wall included
+    """
+    return array("I", range(1, length + 1)) + array("I", [0]), array("I", range(length, 0, -1)) + array("I", [0])
+
+
+def line_runs(line):
+    """
+    run lengths of a line of cells in both directions
+    :param line: bytes-like, cell codes of a row or a column
+    :return: array, array: for every cell, the number of path cells from it to the nearest wall towards the start
+             of the line and towards the end of the line, the cell included (0 for a wall)
+    """
+    before = array("I")
+    after = array("I")
+    for segment in bytes(line).split(_WALL_BYTE):
+        segment_before, segment_after = segment_runs(len(segment))
+        before.extend(segment_before)
+        after.extend(segment_after)
+    # there is no wall after the last segment
+    before.pop()
+    after.pop()
+    return before, after
+
+
+class CorridorTable:
+
+    def __init__(self, maze):
+        """
+        build the run lengths of every cell of a maze, one pass over its rows and one over its columns
+        :param maze: Maze class object
+        self.up, self.down, self.left, self.right: array, one entry per cell of maze.grid (cell (i, j) is at
+            i * size + j), number of path cells from the cell to the nearest wall towards i - 1, i + 1, j - 1 and
+            j + 1, the cell included, 0 for a wall
+        """
+        grid = maze.grid
+        size = maze.size
+        self.size = size
+        self.up = array("I", [0]) * (size * size)
+        self.down = array("I", [0]) * (size * size)
+        self.left = array("I")
+        self.right = array("I")
+        for i in range(size):
+            left, right = line_runs(grid[i * size:(i + 1) * size])
+            self.left.extend(left)
+            self.right.extend(right)
+        for j in range(size):
+            up, down = line_runs(grid[j:size * size:size])
+            self.up[j::size] = up
+            self.down[j::size] = down
+
+    def space(self, i, j, direction):
+        """
+        :param i: int, row index
+        :param j: int, column index
+        :param direction: str, "up", "down", "left" or "right"
+        :return: int, number of path cells from cell (i, j) to the nearest wall in the direction, the cell included
+        """
+        return getattr(self, direction)[i * self.size + j]
+
+    def horizontal_run(self, i, j):
+        """
+        :param i: int, row index
+        :param j: int, column index
+        :return: int, length of the corridor along j going through cell (i, j), 0 for a wall
+        """
+        k = i * self.size + j
+        return max(0, self.left[k] + self.right[k] - 1)
+
+    def vertical_run(self, i, j):
+        """
+        :param i: int, row index
+        :param j: int, column index
+        :return: int, length of the corridor along i going through cell (i, j), 0 for a wall
+        """
+        k = i * self.size + j
+        return max(0, self.up[k] + self.down[k] - 1)
@@ -0,0 +1,254 @@
+"""
+database.py
+This file contains the score database portal.
+It doesn't use pygame, so it is shared by the game and the headless simulation runner.
+The games played, their total and the high score are kept in the score_stats row, updated by a trigger in the same
+transaction as every insert, so the statistics are read in constant time however long the history gets.
+The schema is versioned with PRAGMA user_version, init_database applies the migrations a database is missing.
+Every game is a row of the games table with its time and maze parameters, indexed by both, and a trigger counts the
+games of every score in score_counts, so the percentile rank of a score, histograms and leaderboards over a time
+window are answered by SQL from an index or a table of a few rows, not by loading the history into Python.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import sqlite3
+import time
+
+DATABASE = "scores.db"
+
+
+# migrations, MIGRATIONS[v] takes a database from user_version v to v + 1
+MIGRATIONS = [
+    # 1: score history
+    ["CREATE TABLE IF NOT EXISTS scores(past_scores int)"],
+    # 2: aggregate of the history, backfilled from the scores already there and kept up to date by a trigger
+    ["CREATE TABLE IF NOT EXISTS score_stats(id INTEGER PRIMARY KEY CHECK (id = 0), "
+     "games INTEGER NOT NULL, total INTEGER NOT NULL, best INTEGER)",
+     "INSERT OR REPLACE INTO score_stats(id, games, total, best) "
+     "SELECT 0, COUNT(*), COALESCE(SUM(past_scores), 0), MAX(past_scores) FROM scores",
+     "CREATE TRIGGER IF NOT EXISTS score_stats_insert AFTER INSERT ON scores BEGIN "
+     "UPDATE score_stats SET games = games + 1, total = total + NEW.past_scores, "
+     "best = MAX(COALESCE(best, NEW.past_scores), NEW.past_scores) WHERE id = 0; END"],
+    # 3: one row per game with its time (unix time) and maze parameters, 0 where the old history doesn't know them,
+    # and the number of games of every score per maze parameters
+    ["CREATE TABLE games(id INTEGER PRIMARY KEY, score INTEGER NOT NULL, "
+     "maze_size INTEGER NOT NULL DEFAULT 0, num_treasures INTEGER NOT NULL DEFAULT 0, played_at REAL)",
+     "INSERT INTO games(score) SELECT past_scores FROM scores WHERE past_scores IS NOT NULL ORDER BY rowid",
+     "DROP TRIGGER score_stats_insert",
+     "DROP TABLE scores",
+     "CREATE INDEX games_played_at ON games(played_at, score, maze_size, num_treasures)",
+     "CREATE INDEX games_maze ON games(maze_size, num_treasures, score DESC, played_at)",
+     "CREATE INDEX games_score ON games(score DESC, played_at)",
+     "CREATE TABLE score_counts(maze_size INTEGER NOT NULL, num_treasures INTEGER NOT NULL, score INTEGER NOT NULL, "
+     "games INTEGER NOT NULL, PRIMARY KEY (maze_size, num_treasures, score)) WITHOUT ROWID",
+     "INSERT INTO score_counts(maze_size, num_treasures, score, games) "
+     "SELECT maze_size, num_treasures, score, COUNT(*) FROM games GROUP BY maze_size, num_treasures, score",
+     "INSERT OR REPLACE INTO score_stats(id, games, total, best) "
+     "SELECT 0, COUNT(*), COALESCE(SUM(score), 0), MAX(score) FROM games",
+     "CREATE TRIGGER games_insert AFTER INSERT ON games BEGIN "
+     "UPDATE score_stats SET games = games + 1, total = total + NEW.score, "
+     "best = MAX(COALESCE(best, NEW.score), NEW.score) WHERE id = 0; "
+     "INSERT INTO score_counts(maze_size, num_treasures, score, games) "
+     "VALUES (NEW.maze_size, NEW.num_treasures, NEW.score, 1) "
+     "ON CONFLICT (maze_size, num_treasures, score) DO UPDATE SET games = games + 1; END"],
+    # 4: input log of the game (see replay.py), to play it back
+    ["ALTER TABLE games ADD COLUMN replay BLOB"],
+]
+
+
+def migrate(conn):
+    """
+    apply the migrations the database is missing, each one in its own transaction
+    :param conn: sqlite3.Connection
+    :return: int, schema version of the database
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version in range(version, len(MIGRATIONS)):
+        conn.execute("BEGIN")
+        try:
+            for statement in MIGRATIONS[version]:
+                conn.execute(statement)
+            # PRAGMA doesn't take parameters
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def init_database(database=DATABASE):
+    """
+    Create database if not exist, and bring an existing one up to the current schema
+    :param database: str, path of the database file
+    :return: None
+    """
+    conn = sqlite3.connect(database)
+    migrate(conn)
+    conn.close()
+
+
+def read_stats(cur):
+    """
+    :param cur: sqlite3.Cursor
+    :return: int, float: highest_score, average, -1, -1 if no game has been played yet
+    """
+    cur.execute("SELECT games, total, best FROM score_stats WHERE id = 0")
+    games, total, best = cur.fetchone()
+    if games == 0:
+        return -1, -1
+    return best, total / games
+
+
+def score_stats(database=DATABASE):
+    """
+    all time high and average, without inserting a score
+    :param database: str, path of the database file
+    :return: int, float: highest_score, average, -1, -1 if no game has been played yet
+    """
+    conn = sqlite3.connect(database)
+    highest_score, average = read_stats(conn.cursor())
+    conn.close()
+    return highest_score, average
+
+
+def insert_game(cur, score, maze_size=0, num_treasures=0, played_at=None, replay=None):
+    """
+    insert a game into the history, the triggers count it in score_stats and score_counts
+    :param cur: sqlite3.Cursor
+    :param score: int, score of the game
+    :param maze_size: int, size of the maze, 0 if unknown
+    :param num_treasures: int, number of treasures of the round, 0 if unknown
+    :param played_at: float, unix time the game ended, now if None
+    :param replay: bytes, input log of the game, None if it wasn't recorded
+    :return: None
+    """
+    cur.execute("INSERT INTO games(score, maze_size, num_treasures, played_at, replay) VALUES (?, ?, ?, ?, ?)",
+                (score, maze_size, num_treasures, time.time() if played_at is None else played_at, replay))
+
+
+def game_filter(maze_size=None, num_treasures=None, since=None):
+    """
+    conditions on the games (or score_counts) to count, only the ones given so the indexes are used
+    :param maze_size: int, only the games on mazes of this size, all if None
+    :param num_treasures: int, only the games with this number of treasures, all if None
+    :param since: float, only the games played from this unix time on, all if None
+    :return: list of str, list: the conditions and their parameters
+    """
+    conditions = []
+    params = []
+    for column, operator, value in (("maze_size", "=", maze_size), ("num_treasures", "=", num_treasures),
+                                    ("played_at", ">=", since)):
+        if value is not None:
+            conditions.append(f"{column} {operator} ?")
+            params.append(value)
+    return conditions, params
+
+
+def where(conditions):
+    """
+    :param conditions: list of str
+    :return: str, WHERE clause of the conditions, "" if there is none
+    """
+    return " WHERE " + " AND ".join(conditions) if conditions else ""
+
+
+def window_start(window, now=None):
+    """
+    :param window: float, length of a rolling window in seconds, None for all time
+    :param now: float, unix time the window ends at, now if None
+    :return: float, unix time the window starts at, None for all time
+    """
+    if window is None:
+        return None
+    return (time.time() if now is None else now) - window
+
+
+def percentile_rank(cur, score, maze_size=None, num_treasures=None):
+    """
+    share of the games with a lower score, from the counts of every score
+    :param cur: sqlite3.Cursor
+    :param score: int
+    :param maze_size: int, only the games on mazes of this size, all if None
+    :param num_treasures: int, only the games with this number of treasures, all if None
+    :return: float, between 0 and 1, -1 if there is no game
+    """
+    conditions, params = game_filter(maze_size, num_treasures)
+    cur.execute("SELECT SUM(CASE WHEN score < ? THEN games ELSE 0 END), SUM(games) FROM score_counts" +
+                where(conditions), [score] + params)
+    lower, games = cur.fetchone()
+    return lower / games if games else -1
+
+
+def histogram(cur, maze_size=None, num_treasures=None, window=None, now=None):
+    """
+    number of games of every score
+    :param cur: sqlite3.Cursor
+    :param maze_size: int, only the games on mazes of this size, all if None
+    :param num_treasures: int, only the games with this number of treasures, all if None
+    :param window: float, only the games of the last window seconds, all if None
+    :param now: float, unix time the window ends at, now if None
+    :return: list of (score, games), in increasing score
+    """
+    if window is None:
+        # all time: from the counts, a few rows
+        conditions, params = game_filter(maze_size, num_treasures)
+        cur.execute("SELECT score, SUM(games) FROM score_counts" + where(conditions) +
+                    " GROUP BY score ORDER BY score", params)
+    else:
+        # the games of the window, read from the time index alone
+        # (sqlite can't tell how few games a window holds, and would rather scan the whole score index)
+        conditions, params = game_filter(maze_size, num_treasures, window_start(window, now))
+        cur.execute("SELECT score, COUNT(*) FROM games INDEXED BY games_played_at" + where(conditions) +
+                    " GROUP BY score ORDER BY score", params)
+    return cur.fetchall()
+
+
+def leaderboard(cur, limit=10, window=None, maze_size=None, num_treasures=None, now=None):
+    """
+    best games, the earliest first among equal scores
+    one index search per score, from the best score down, so only the games on the leaderboard are read
+    however many games the history or the window holds
+    :param cur: sqlite3.Cursor
+    :param limit: int, max number of games
+    :param window: float, only the games of the last window seconds (rolling window), all if None
+    :param maze_size: int, only the games on mazes of this size, all if None
+    :param num_treasures: int, only the games with this number of treasures, all if None
+    :param now: float, unix time the window ends at, now if None
+    :return: list of (score, played_at, maze_size, num_treasures)
+    """
+    conditions, params = game_filter(maze_size, num_treasures)
+    cur.execute("SELECT DISTINCT score FROM score_counts" + where(conditions) + " ORDER BY score DESC", params)
+    scores = [score for score, in cur.fetchall()]
+    # games ordered by (maze parameters,) score and time in the index
+    index = "games_maze" if maze_size is not None and num_treasures is not None else "games_score"
+    conditions, params = game_filter(maze_size, num_treasures, window_start(window, now))
+    games = []
+    for score in scores:
+        if len(games) >= limit:
+            break
+        cur.execute(f"SELECT score, played_at, maze_size, num_treasures FROM games INDEXED BY {index}" +
+                    where(["score = ?"] + conditions) + " ORDER BY played_at LIMIT ?",
+                    [score] + params + [limit - len(games)])
+        games.extend(cur.fetchall())
+    return games
+
+
+def update_database(score, database=DATABASE, maze_size=0, num_treasures=0):
+    """
+    insert current score into database, and return the all time high and average from the aggregate row.
+    :param score: int, current score
+    :param database: str, path of the database file
+    :param maze_size: int, size of the maze, 0 if unknown
+    :param num_treasures: int, number of treasures of the round, 0 if unknown
+    :return: int, float: highest_score, average
+    """
+    conn = sqlite3.connect(database)
+    cur = conn.cursor()
+    insert_game(cur, score, maze_size, num_treasures)  # add current score, the triggers count it
+    highest_score, average = read_stats(cur)
+    conn.commit()
+    conn.close()
+    return highest_score, average
@@ -0,0 +1,147 @@
+"""
+eller.py
+This file contains a row-streaming maze generator (Eller's algorithm), for mazes far too large for Maze.
+It yields the maze one row at a time and only keeps the row being built in memory, so a maze of any height
+can be written straight to disk in the binary format of maze_file.py.
+The rows use the same layout and cell codes as Maze.grid: walls on even indexes, cells on odd indexes,
+and a frame of walls all around.
+
+usage: python eller.py --height 100001 --width 101 --output huge.bin [--seed 42]
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import argparse
+import random
+import time
+from maze import Maze
+from maze_file import pack_header, pack_row
+
+
+def check_size(height, width):
+    """
+    :param height: int, number of rows, odd and >= 3
+    :param width: int, number of cells in a row, odd and >= 3
+    :return: None, raise ValueError if the size is not valid
+    """
+    if height < 3 or width < 3 or height % 2 == 0 or width % 2 == 0:
+        raise ValueError("height and width must be odd and at least 3")
+
+
+def eller_rows(height, width, seed=None):
+    """
+    generate a maze row by row with Eller's algorithm
+    every cell of a row belongs to a set of cells already connected to each other (through the rows above),
+    neighbours of different sets are randomly joined, then every set is carried down to the next row
+    through at least one opening; the last row joins all the sets left, so the maze is a perfect maze
+    :param height: int, number of rows, odd and >= 3
+    :param width: int, number of cells in a row, odd and >= 3
+    :param seed: int, the same seed always gives the same maze, a random one is picked if None
+    :return: generator of bytearray, the rows from top to bottom, one Maze cell code per byte
+    """
+    check_size(height, width)
+    rng = random.Random(seed if seed is not None else random.getrandbits(64))
+    wall_line = bytes([Maze.WALL_CELL]) * width
+    cells = (width - 1) // 2
+    cell_rows = (height - 1) // 2
+    sets = [0] * cells  # set of each cell of the row
+    members = {}  # set -> columns of the row in it
+    down = [False] * cells  # cells connected to the cell above
+    next_set = 0
+
+    # top of the frame
+    yield bytearray(wall_line)
+    for r in range(cell_rows):
+        last = r == cell_rows - 1
+        # cells not connected from above start a set of their own
+        for c in range(cells):
+            if not down[c]:
+                sets[c] = next_set
+                members[next_set] = [c]
+                next_set += 1
+        row = bytearray(wall_line)
+        row[1:width - 1:2] = bytes([Maze.PATH_CELL]) * cells
+        # join neighbours of different sets, all of them on the last row
+        for c in range(cells - 1):
+            a, b = sets[c], sets[c + 1]
+            if a != b and (last or rng.random() < 0.5):
+                # relabel the smaller set
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                for k in members[b]:
+                    sets[k] = a
+                members[a].extend(members.pop(b))
+                row[2 * c + 2] = Maze.PATH_CELL
+        yield row
+        if last:
+            break
+        # openings down to the next row, at least one per set
+        below = bytearray(wall_line)
+        down = [False] * cells
+        for columns in members.values():
+            openings = [k for k in columns if rng.random() < 0.5] or [rng.choice(columns)]
+            for k in openings:
+                down[k] = True
+                below[2 * k + 1] = Maze.PATH_CELL
+        yield below
+        # only the sets going down are carried to the next row
+        members = {}
+        for c in range(cells):
+            if down[c]:
+                members.setdefault(sets[c], []).append(c)
+    # bottom of the frame
+    yield bytearray(wall_line)
+
+
+def eller_maze(size, seed=None):
+    """
+    :param size: int, the length of the square maze map, same rules as Maze
+    :param seed: int, the same seed always gives the same maze, a random one is picked if None
+    :return: Maze class object, generated with Eller's algorithm
+    """
+    if not (10 < size < 60 and (size - 1) % 2 == 0):
+        raise ValueError
+    seed = seed if seed is not None else random.getrandbits(64)
+    return Maze.from_grid(size, bytearray(b"".join(eller_rows(size, size, seed))), seed)
+
+
+def write_eller(output, height, width, seed=None):
+    """
+    stream a maze into a binary maze file, one row at a time
+    :param output: file object, opened for writing bytes
+    :param height: int, number of rows, odd and >= 3
+    :param width: int, number of cells in a row, odd and >= 3
+    :param seed: int, the same seed always gives the same maze, a random one is picked if None
+    :return: int, seed of the maze
+    """
+    check_size(height, width)
+    seed = seed if seed is not None else random.getrandbits(64)
+    output.write(pack_header(height, width, seed, "eller"))
+    for row in eller_rows(height, width, seed):
+        output.write(pack_row(row))
+    return seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="stream a huge maze to a binary maze file")
+    parser.add_argument("--height", type=int, default=100001, help="number of rows, odd")
+    parser.add_argument("--width", type=int, default=101, help="number of cells in a row, odd")
+    parser.add_argument("--output", default="huge.bin", help="file to write the maze to")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the maze")
+    args = parser.parse_args()
+    try:
+        check_size(args.height, args.width)
+    except ValueError as error:
+        parser.error(str(error))
+
+    start = time.perf_counter()
+    with open(args.output, "wb") as output:
+        seed = write_eller(output, args.height, args.width, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{args.height} x {args.width} maze (seed {seed}) in {elapsed:.2f}s, "
+          f"{args.height / elapsed:.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+"""
+game_state.py
+This file contains GameState class, the game logic of one round: movement, collision, trapping walls,
+treasure pickup and the countdown.
+It doesn't use pygame, so rounds can run without a display, and many of them in one process.
+main.py drives it with the keyboard and draws it on screen.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import random
+from collections import namedtuple
+from constants import *
+from corridors import CorridorTable
+from placement import place_treasures
+from solver import layout_ok
+from tile_index import TileIndex
+
+# keys held down during one step
+Inputs = namedtuple("Inputs", ["up", "down", "left", "right", "start"])
+NO_INPUTS = Inputs(False, False, False, False, False)
+
+# player start position in world space
+PLAYER_START = 5 * BLOCK_SIZE + CHARACTER_PADDING
+PLAYER_SIZE = BLOCK_SIZE - 2 * CHARACTER_PADDING
+# cell of maze.grid the player starts in
+PLAYER_START_CELL = ((PLAYER_START - MAZE_ORIGIN) // BLOCK_SIZE, (PLAYER_START - MAZE_ORIGIN) // BLOCK_SIZE)
+
+# status indexes of the trapping wall motion cycle where the walls can kill the player
+CLOSE_INDEX = [0, 1, 2, 3, 10, 11]
+
+# length of a round and the moment the times up sound starts, in steps
+ROUND_STEPS = TIME * 60 * FPS
+TIMES_UP_WARNING_STEPS = int(1.5 * FPS)
+
+
+class Rect:
+    """
+    integer rectangle with the parts of pygame.Rect the game logic needs
+    """
+
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def __repr__(self):
+        return f"Rect({self.x}, {self.y}, {self.width}, {self.height})"
+
+    def __eq__(self, other):
+        return (self.x, self.y, self.width, self.height) == (other.x, other.y, other.width, other.height)
+
+    @property
+    def right(self):
+        return self.x + self.width
+
+    @property
+    def bottom(self):
+        return self.y + self.height
+
+    @property
+    def size(self):
+        return self.width, self.height
+
+    def colliderect(self, other):
+        """
+        :param other: Rect
+        :return: True if the two rects overlap, same rule as pygame.Rect.colliderect
+        """
+        return (self.width > 0 and self.height > 0 and other.width > 0 and other.height > 0
+                and self.x < other.x + other.width and other.x < self.x + self.width
+                and self.y < other.y + other.height and other.y < self.y + self.height)
+
+    def move(self, x, y):
+        """
+        :return: Rect, a copy moved by (x, y)
+        """
+        return Rect(self.x + x, self.y + y, self.width, self.height)
+
+    def union(self, other):
+        """
+        :return: Rect, the smallest rect covering both rects
+        """
+        x = min(self.x, other.x)
+        y = min(self.y, other.y)
+        return Rect(x, y, max(self.right, other.right) - x, max(self.bottom, other.bottom) - y)
+
+
+class GameState:
+
+    def __init__(self, maze, rng=None):
+        """
+        prepare a round on the given maze: build walls, distribute treasures and trapping walls
+        :param maze: Maze class object
+        :param rng: random.Random, used to place the treasures,
+                    seeded from the maze seed if not given, so a seed gives back the whole round
+        self.events: list, what happened during the last step, for sound effects:
+                     "start", "collected", "killed", "times_up"
+        """
+        self.maze = maze
+        if rng is None:
+            rng = random.Random(maze.seed) if getattr(maze, "seed", None) is not None else random
+        self.rng = rng
+        self.walls = []
+        self.paths = []
+        self.treasure_list = []
+        self.treasure_collected = []
+        self.trap_wall_list = []
+        self.trap_wall_moving_dir = []
+        self.trap_wall_last_motion = []
+        # what occupies each tile, for collision checks
+        self.wall_index = TileIndex(MAZE_ORIGIN, BLOCK_SIZE)
+        self.treasure_index = TileIndex(MAZE_ORIGIN, BLOCK_SIZE)
+        self.trap_wall_index = TileIndex(MAZE_ORIGIN, BLOCK_SIZE)
+        self.init_maze()
+        # run lengths of the corridors of the maze
+        self.corridors = CorridorTable(maze)
+        self.treasure_positions = self.distribute_treasures()
+        self.distribute_trapping_walls(self.treasure_positions)
+        # player
+        self.player = Rect(PLAYER_START, PLAYER_START, PLAYER_SIZE, PLAYER_SIZE)
+        self.player_heading_dir = 1  # down
+        self.player_standing_still = True
+        self.player_killed = False
+        # round progress
+        self.score = 0
+        self.started = False
+        self.steps = 0  # steps since the round started
+        self.times_up_sound_played = False
+        # trapping walls motion
+        self.trap_wall_counter = 0
+        self.trap_wall_status_index = 0
+        self.events = []
+
+    @property
+    def num_treasures(self):
+        return len(self.treasure_list)
+
+    @property
+    def time_left(self):
+        """
+        :return: float, seconds left in the round
+        """
+        return (ROUND_STEPS - self.steps) / FPS
+
+    @property
+    def game_over(self):
+        """
+        :return: True if the time is up or the player is killed
+        """
+        return self.steps >= ROUND_STEPS or self.player_killed
+
+    def step(self, inputs):
+        """
+        advance the round by one frame (1 / FPS second)
+        :param inputs: Inputs, keys held down
+        :return: None
+        """
+        self.events = []
+        if self.game_over:
+            return
+        # times up sound effect
+        if not self.times_up_sound_played and self.steps >= ROUND_STEPS - TIMES_UP_WARNING_STEPS:
+            self.times_up_sound_played = True
+            self.events.append("times_up")
+        if not self.player_killed and self.player_killed_by_trap_walls():
+            self.player_killed = True
+            self.events.append("killed")
+        # start game
+        if not self.started:
+            if inputs.start:
+                self.started = True
+                self.events.append("start")
+            return
+        # update maze
+        self.move_player(inputs)
+        self.trap_wall_counter += 1
+        self.move_trap_walls()
+        # update score
+        self.collect_treasure()
+        self.steps += 1
+
+    def init_maze(self):
+        """
+        create walls and paths from the maze, in world space
+        :return: None
+        """
+        grid = self.maze.grid
+        size = self.maze.size
+        for i in range(size):
+            for j in range(size):
+                block = Rect(i * BLOCK_SIZE + MAZE_ORIGIN, j * BLOCK_SIZE + MAZE_ORIGIN, BLOCK_SIZE, BLOCK_SIZE)
+                if grid[i * size + j] == self.maze.PATH_CELL:
+                    self.paths.append(block)
+                else:
+                    self.walls.append(block)
+                    self.wall_index.add(block, block)
+
+    def move_player(self, inputs):
+        """
+        move the player through the world responded to the user input
+        :param inputs: Inputs, keys held down
+        :return: None
+        """
+        distance = SPEED
+        direction = self.avoid_collision()
+        if inputs.up:
+            if not self.walls_ahead([0, -1 * SPEED]):
+                direction[1] -= distance
+                self.player_heading_dir = 0
+        if inputs.down:
+            if not self.walls_ahead([0, 1 * SPEED]):
+                direction[1] += distance
+                self.player_heading_dir = 1
+        if inputs.left:
+            if not self.walls_ahead([-1 * SPEED, 0]):
+                direction[0] -= distance
+                self.player_heading_dir = 2
+        if inputs.right:
+            if not self.walls_ahead([1 * SPEED, 0]):
+                direction[0] += distance
+                self.player_heading_dir = 3
+        self.player.x += direction[0]
+        self.player.y += direction[1]
+        self.player_standing_still = direction == [0, 0]
+
+    def walls_ahead(self, dir):
+        """
+        check if player will collide into wall heading to given direction
+        :param dir: [x, y], direction player's going
+        :return: True/False, if will collide into wall -> return True
+        """
+        new_position = self.player.move(dir[0], dir[1])
+        for wall in self.wall_index.query(new_position):
+            if new_position.colliderect(wall):
+                return True
+        return False
+
+    def avoid_collision(self):
+        """
+        push the player out of the walls it overlaps
+        :return: dir, list, [x, y] direction player is moving to
+        """
+        direction = [0, 0]
+        for wall in self.wall_index.query(self.player):
+            if self.player.colliderect(wall):
+                direction = self.adjust_dir_to_avoid_collision(wall, direction)
+        return direction
+
+    def adjust_dir_to_avoid_collision(self, wall, dir):
+        """
+        correct the direction player is moving to if player will collide with walls in the maze
+        player can't move trough walls
+        :param wall: Rect, block of wall
+        :param dir: list, [x, y] direction player is moving to
+        :return: dir
+        """
+        safe_position = self.player.move(0, 0)
+        while self.player.colliderect(wall):
+            safe_position.x -= SPEED
+            if not safe_position.colliderect(wall):
+                dir[0] -= SPEED
+                break
+            safe_position.x += 2 * SPEED
+            if not safe_position.colliderect(wall):
+                dir[0] += SPEED
+                break
+            safe_position.x -= SPEED
+            safe_position.y -= SPEED
+            if not safe_position.colliderect(wall):
+                dir[1] -= SPEED
+                break
+            safe_position.y += 2 * SPEED
+            if not safe_position.colliderect(wall):
+                dir[1] += SPEED
+                break
+        return dir
+
+    def distribute_treasures(self):
+        """
+        distribute treasures into the maze, one in each region that has a valid position (see placement.py),
+        drawn again while a treasure can't be reached from the start or all of them can't be collected in a round
+        (at most LAYOUT_ATTEMPTS times, the last layout is kept then)
+        :return: treasure_positions, list of [i, j] in maze.grid
+        """
+        for _ in range(LAYOUT_ATTEMPTS):
+            treasure_positions = place_treasures(self.maze, self.rng)
+            if layout_ok(self.maze, PLAYER_START_CELL, treasure_positions, MAX_TOUR):
+                break
+        for position in treasure_positions:
+            treasure = Rect(position[0] * BLOCK_SIZE + MAZE_ORIGIN,
+                            position[1] * BLOCK_SIZE + MAZE_ORIGIN, BLOCK_SIZE, BLOCK_SIZE)
+            self.treasure_index.add(len(self.treasure_list), treasure)
+            self.treasure_list.append(treasure)
+        self.treasure_collected = [False for _ in range(len(self.treasure_list))]
+        return treasure_positions
+
+    def collect_treasure(self):
+        """
+        record treasures that has been collected by players
+        :return: None
+        """
+        for i in self.treasure_index.query(self.player):
+            if not self.treasure_collected[i] and self.player.colliderect(self.treasure_list[i]):
+                self.score += 1
+                self.treasure_collected[i] = True
+                self.events.append("collected")
+
+    def distribute_trapping_walls(self, treasure_positions):
+        """
+        distribute trapping walls into the maze
+        each trapping wall should be near the corresponded treasure
+        :param treasure_positions: list, positions of the treasures in maze.grid
+        :return: None
+        """
+        trap_wall_positions = []
+        grid = self.maze.grid
+        size = self.maze.size
+        wall = self.maze.WALL_CELL
+        # open space around every cell, looked up instead of walked
+        corridors = self.corridors
+        for i in range(len(self.treasure_list)):
+            position = treasure_positions[i]
+            x, y = position[0], position[1]
+            k = x * size + y
+            # check surrounding
+            # up-down walls
+            if grid[k - size] == wall and grid[k + size] == wall:
+                space_on_left = corridors.left[k]
+                space_on_right = corridors.right[k]
+                if space_on_left >= space_on_right and space_on_left > 1:
+                    trap_wall_positions.append([x, y-1])
+                    self.trap_wall_moving_dir.append("left")
+                elif space_on_left <= space_on_right and space_on_right > 1:
+                    trap_wall_positions.append([x, y+1])
+                    self.trap_wall_moving_dir.append("right")
+            elif grid[k - 1] == wall and grid[k + 1] == wall:
+                space_on_top = corridors.up[k]
+                space_on_bottom = corridors.down[k]
+                if space_on_top >= space_on_bottom and space_on_top > 1:
+                    trap_wall_positions.append([x-1, y])
+                    self.trap_wall_moving_dir.append("up")
+                elif space_on_top <= space_on_bottom and space_on_bottom > 1:
+                    trap_wall_positions.append([x+1, y])
+                    self.trap_wall_moving_dir.append("down")
+        for i in range(len(trap_wall_positions)):
+            position = trap_wall_positions[i]
+            trap_wall = Rect(position[0] * BLOCK_SIZE + MAZE_ORIGIN,
+                             position[1] * BLOCK_SIZE + MAZE_ORIGIN,
+                             BLOCK_SIZE, BLOCK_SIZE)
+            # register the trapping wall on all tiles it slides over
+            if self.trap_wall_moving_dir[i] == "up":
+                reach = trap_wall.move(0, -TRAP_WALL_REACH)
+            elif self.trap_wall_moving_dir[i] == "down":
+                reach = trap_wall.move(0, TRAP_WALL_REACH)
+            elif self.trap_wall_moving_dir[i] == "left":
+                reach = trap_wall.move(-TRAP_WALL_REACH, 0)
+            else:
+                reach = trap_wall.move(TRAP_WALL_REACH, 0)
+            self.trap_wall_index.add(len(self.trap_wall_list), trap_wall.union(reach))
+            self.trap_wall_list.append(trap_wall)
+        self.trap_wall_last_motion = [[] for _ in range(len(self.trap_wall_list))]
+
+    def move_trap_walls(self):
+        """
+        update trapping walls movements, they move one step of TRAP_WALL_MOTION every FPS // 8 frames
+        :return: None
+        """
+        if self.trap_wall_counter > FPS // 8:
+            self.trap_wall_status_index = (self.trap_wall_status_index + 1) % 12
+            motion = TRAP_WALL_MOTION[self.trap_wall_status_index]
+            self.trap_wall_counter = 0
+            for i, trap_wall in enumerate(self.trap_wall_list):
+                last_motion = self.trap_wall_last_motion[i]
+                # the trapping wall of a collected treasure stops once it is back in the wall
+                if self.treasure_collected[i] and last_motion != [] and (last_motion[-1] == 6
+                                                                         or last_motion[-1] == 7):
+                    continue
+                elif self.treasure_collected[i]:
+                    last_motion.append(self.trap_wall_status_index)
+                if self.trap_wall_moving_dir[i] == "up":
+                    trap_wall.y += motion
+                elif self.trap_wall_moving_dir[i] == "down":
+                    trap_wall.y -= motion
+                elif self.trap_wall_moving_dir[i] == "left":
+                    trap_wall.x += motion
+                elif self.trap_wall_moving_dir[i] == "right":
+                    trap_wall.x -= motion
+
+    def player_killed_by_trap_walls(self):
+        """
+        check if player is killed by the trapping walls
+        :return: True if player collide with any of the trap_wall while the wall is in closed status
+        """
+        if self.trap_wall_status_index not in CLOSE_INDEX:
+            return False
+        for i in self.trap_wall_index.query(self.player):
+            if self.player.colliderect(self.trap_wall_list[i]):
+                return True
+        return False
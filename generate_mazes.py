@@ -0,0 +1,100 @@
+"""
+generate_mazes.py
+This file generates a pool of mazes offline, across a pool of processes.
+The mazes are written to the output file batch after batch, in order, so the pool is never held in memory,
+either in the text format of Maze.__str__ separated by an empty line, or in the binary format of maze_file.py.
+
+usage: python generate_mazes.py --count 10000 --size 43 --workers 1 2 4 8 --output mazes.bin --format binary
+with more than one worker count, each of them generates the whole pool (the file keeps the last one)
+and their throughput is compared.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import argparse
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from maze import Maze
+from maze_file import pack_maze
+
+# number of mazes generated by one task, so the processes don't talk for every single maze
+BATCH_SIZE = 64
+
+
+def generate_batch(size, count, seed, binary=False):
+    """
+    generate a batch of mazes
+    :param size: int, size of the mazes
+    :param count: int, number of mazes
+    :param seed: int, seed of the batch, the seeds of its mazes are drawn from it
+    :param binary: Boolean, True for the binary format, text format otherwise
+    :return: bytes (binary) or str (text), the mazes
+    """
+    seeds = random.Random(seed)
+    mazes = (Maze(size, seeds.getrandbits(64)) for _ in range(count))
+    if binary:
+        return b"".join(pack_maze(maze) for maze in mazes)
+    return "".join(str(maze) + "\n\n" for maze in mazes)
+
+
+def generate_mazes(count, size, workers, output, seed=None, binary=False):
+    """
+    generate mazes across a process pool and stream them to a file, batch after batch in order
+    :param count: int, number of mazes
+    :param size: int, size of the mazes
+    :param workers: int, number of processes
+    :param output: file object, opened for writing bytes (binary) or text
+    :param seed: int, seed of the first batch, batch k uses seed + k, random if None
+    :param binary: Boolean, True for the binary format, text format otherwise
+    :return: int, number of mazes written
+    """
+    seeds = random.Random(seed)
+    batches = [BATCH_SIZE] * (count // BATCH_SIZE) + ([count % BATCH_SIZE] if count % BATCH_SIZE else [])
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # batches in flight, in the order they were submitted
+        pending = deque()
+        next_batch = 0
+        while next_batch < len(batches) or pending:
+            # keep a few batches per worker in flight, so finished mazes never pile up in memory
+            while next_batch < len(batches) and len(pending) < workers * 4:
+                batch_seed = seed + next_batch if seed is not None else seeds.getrandbits(64)
+                future = executor.submit(generate_batch, size, batches[next_batch], batch_seed, binary)
+                pending.append((future, batches[next_batch]))
+                next_batch += 1
+            # written in submission order, so a seed gives back the same file and maze k is always the same
+            future, batch = pending.popleft()
+            output.write(future.result())
+            written += batch
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="generate a pool of mazes across a process pool")
+    parser.add_argument("--count", type=int, default=1000, help="number of mazes")
+    parser.add_argument("--size", type=int, default=43, help="size of the mazes, odd and between 11 and 59")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1], help="number of processes, one or more")
+    parser.add_argument("--output", default="mazes.txt", help="file to write the mazes to")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the first batch")
+    parser.add_argument("--format", choices=["text", "binary"], default="text", help="format of the output file")
+    args = parser.parse_args()
+    # check maze size before starting the processes
+    try:
+        Maze(args.size)
+    except ValueError:
+        parser.error("size must be odd and between 11 and 59")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        binary = args.format == "binary"
+        with open(args.output, "wb" if binary else "w") as output:
+            written = generate_mazes(args.count, args.size, workers, output, args.seed, binary)
+        elapsed = time.perf_counter() - start
+        print(f"workers {workers}: {written} mazes in {elapsed:.2f}s, {written / elapsed:.1f} mazes/s")
+
+
+if __name__ == "__main__":
+    main()
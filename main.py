@@ -2,17 +2,26 @@
 Main.py
 This file contains main game loop and all necessary functions.
 Run the script to start the game.
+The game logic lives in GameState (game_state.py), this file reads the keyboard, plays the sounds and draws it.
+Run it with --explore for the exploration mode, an endless maze generated around the player (world.py).
 
 Author: Allyn Bao
 Date last modified: 9/9/2021
 """
 
+import os
 import pygame
+from collections import OrderedDict
 from maze import Maze
+from world import ChunkedWorld, ExploreState
+from camera import Camera
+from game_state import GameState, Inputs, PLAYER_START
+from render_cache import RenderCache
+from score_service import ScoreService
+from replay import InputRecorder
+from timestep import FixedTimestep, InterpolatedState, snapshot
+import assets
 from assets import *
-from random import randint
-from datetime import datetime, timedelta
-import sqlite3
 import sys
 
 pygame.init()
@@ -23,77 +32,159 @@ pygame.mixer.init()
 WIN = pygame.display.set_mode((LEN, LEN + LEN // 11))
 pygame.display.set_caption("aMAZEing Fortune")
 pygame.display.set_icon(pygame.image.load(os.path.join("Assets", "icon.png")))
-walls = []
-paths = []
-treasure_list = []
-num_treasures = 0
-treasure_collected = []
-trap_wall_list = []
-trap_wall_moving_dir = []
-trap_wall_last_motion = []
-obstacles = []
-
-connection = sqlite3.connect("scores.db")
-cursor = connection.cursor()
-cursor.execute("CREATE TABLE IF NOT EXISTS scores(past_scores int)")
-connection.commit()
-connection.close()
-
-
-def init_maze(maze):
-    """
-    create maze elements using generated maze class object
-    add maze elements including walls, path, and treasures onto the screen
-    :param maze: Maze class object. maze.list -> 2D array of the text-based maze
+# scores are saved on a background thread, the game loop never waits for the database,
+# started by the first round so explore mode and replays don't open the database
+score_service = None
+
+# sound effects of the GameState events
+EVENT_SOUNDS = {"start": assets.START_GAME_SOUND,
+                "collected": assets.COLLECTED_SOUND,
+                "killed": assets.PLAYER_KILLED_SOUND,
+                "times_up": assets.TIMES_UP_SOUND}
+
+# rotated, scaled and text surfaces reused across frames
+TRAP_WALL_ANGLE = {"up": 0, "down": 180, "left": 90, "right": 270}
+render_cache = RenderCache()
+render_cache.prewarm(rotations=[(assets.trap_wall_view, angle) for angle in TRAP_WALL_ANGLE.values()])
+
+# dirty-rect rendering: what was drawn on the last frame, and the regions of the window
+last_frame = {}
+MAZE_VIEW_RECT = pygame.Rect(0, 0, LEN, LEN)
+PROGRESS_BAR_RECT = pygame.Rect(0, LEN, LEN, LEN // 11)
+static_layer = pygame.Surface((MAZE_SIZE * BLOCK_SIZE, MAZE_SIZE * BLOCK_SIZE))
+static_layer_rect = static_layer.get_rect(topleft=(MAZE_ORIGIN, MAZE_ORIGIN))
+
+# exploration mode: paths and walls of the chunks drawn lately, least recently used first
+CHUNK_LAYERS = 9
+chunk_layers = OrderedDict()
+
+
+def get_score_service():
+    """
+    :return: ScoreService, started on the first call
+    """
+    global score_service
+    if score_service is None:
+        score_service = ScoreService()
+    return score_service
+
+
+def close_score_service():
+    """
+    save the scores still queued, if the score service was started
     :return: None
     """
-    global obstacles
-    for i in range(MAZE_SIZE):
-        for j in range(MAZE_SIZE):
-            block = pygame.Rect(i * BLOCK_SIZE + 4 * BLOCK_SIZE,
-                                j * BLOCK_SIZE + 4 * BLOCK_SIZE,
-                                BLOCK_SIZE, BLOCK_SIZE)
-            if maze.list[i][j] == maze.PATH:
-                paths.append(block)
-            else:
-                walls.append(block)
-    obstacles += walls
+    if score_service is not None:
+        score_service.close()
 
 
-def draw_game(player, start_time, score, player_view, start_game):
+def bake_static_layer(state):
+    """
+    draw all paths and walls once into static_layer, they never change during a round
+    :param state: GameState
+    :return: None
+    """
+    static_layer.fill(BACKGROUND_COLOUR)
+    static_layer.blits([(assets.path_view, (path.x - MAZE_ORIGIN, path.y - MAZE_ORIGIN))
+                        for path in state.paths], False)
+    static_layer.blits([(assets.wall_view, (wall.x - MAZE_ORIGIN, wall.y - MAZE_ORIGIN))
+                        for wall in state.walls], False)
+
+
+def draw_game(state, player_view, camera):
     """
     draw and update graphic elements onto the screen
-    :param player: pygame.Rect object, player
-    :param start_time: datetime, time when game started
-    :param score: int, number of treasure collected
+    :param state: GameState
     :param player_view: pygame.image, formatted player image
-    :param start_game: Boolean, True if the game has started
+    :param camera: Camera, view of the world shown on screen
+    :return: None
+    """
+    countdown_width = countdown_bar_width(state)
+    frame = {"camera": (camera.x, camera.y),
+             "start_game": state.started,
+             "score": state.score,
+             "player_view": player_view,
+             "countdown_width": countdown_width,
+             "trap_walls": [pygame.Rect(camera.apply(trap_wall), trap_wall.size)
+                            for trap_wall in state.trap_wall_list]}
+    # full redraw when the whole view changed
+    if (not DIRTY_RECTS or frame["camera"] != last_frame.get("camera")
+            or frame["start_game"] != last_frame.get("start_game") or frame["score"] != last_frame.get("score")):
+        draw_scene(state, countdown_width, player_view, camera)
+        pygame.display.update()
+    # otherwise only redraw and update the regions that changed
+    else:
+        dirty = []
+        if player_view is not last_frame["player_view"]:
+            dirty.append(pygame.Rect(camera.apply(state.player), state.player.size).clip(MAZE_VIEW_RECT))
+        for old, new in zip(last_frame["trap_walls"], frame["trap_walls"]):
+            if old != new and old.union(new).colliderect(MAZE_VIEW_RECT):
+                dirty.append(old.union(new).clip(MAZE_VIEW_RECT))
+        # the maze view is drawn once, clipped to the bounding box of its changed regions
+        if dirty:
+            WIN.set_clip(dirty[0].unionall(dirty[1:]))
+            WIN.fill(BACKGROUND_COLOUR)
+            draw_maze_view(state, player_view, camera)
+            WIN.set_clip(None)
+        # the bar image covers its whole region, nothing under it needs drawing
+        if countdown_width != last_frame["countdown_width"]:
+            draw_progress_bar(countdown_width, state)
+            dirty.append(PROGRESS_BAR_RECT)
+        if dirty:
+            pygame.display.update(dirty)
+    last_frame.update(frame)
+
+
+def draw_scene(state, countdown_width, player_view, camera):
+    """
+    draw all graphic elements of the game, only the part inside the clip area of WIN is changed
+    :param state: GameState
+    :param countdown_width: int, width of the countdown bar
+    :param player_view: pygame.image, formatted player image
+    :param camera: Camera, view of the world shown on screen
     :return: None
     """
     # background colour
     WIN.fill(BACKGROUND_COLOUR)
-    draw_maze(player, player_view)
-    draw_progress_bar(start_time, score)
-    # display start-game guide if game has not started
-    if not start_game:
-        WIN.blit(guide_view, (0, 0))
-    pygame.display.update()
+    draw_maze_view(state, player_view, camera)
+    draw_progress_bar(countdown_width, state)
+
+
+def draw_maze_view(state, player_view, camera):
+    """
+    draw the maze, and the start-game guide over it if game has not started
+    :param state: GameState
+    :param player_view: pygame.image, formatted player image
+    :param camera: Camera, view of the world shown on screen
+    :return: None
+    """
+    draw_maze(state, player_view, camera)
+    if not state.started:
+        WIN.blit(assets.guide_view, (0, 0))
+
+
+def countdown_bar_width(state):
+    """
+    :param state: GameState
+    :return: int, width of the countdown bar, shrinks from BLOCK_SIZE * 9 to 0 as the time runs out
+    """
+    countdown_percentage = state.time_left / (TIME * 60)
+    return int(BLOCK_SIZE * 9 * countdown_percentage)
 
 
-def draw_progress_bar(start_time, score):
+def draw_progress_bar(countdown_width, state):
     """
     draw progress bar which includes the time countdown bar and score
-    :param start_time: datetime, time when game started
-    :param score: int, number of treasures collected
+    :param countdown_width: int, width of the countdown bar
+    :param state: GameState
     :return: None
     """
     # progress bar
-    WIN.blit(bar_view, (0, 11 * BLOCK_SIZE))
+    WIN.blit(assets.bar_view, (0, 11 * BLOCK_SIZE))
     # score
-    score_text = SCORE_FONT.render(f"{score}/{num_treasures}", 1, PROGRESS_TOP_COLOUR)
+    score_text = render_cache.text(SCORE_FONT, f"{state.score}/{state.num_treasures}", 1, PROGRESS_TOP_COLOUR)
     WIN.blit(score_text, (BLOCK_SIZE * 9 + 2 * BLOCK_SIZE // 3, BLOCK_SIZE * 11 + BLOCK_SIZE // 3))
     # countdown
-    countdown_percentage = (timedelta(minutes=TIME) - (datetime.now() - start_time)) / timedelta(minutes=TIME)
     back_bar = pygame.Rect(BLOCK_SIZE // 3,
                            BLOCK_SIZE * 11 + BLOCK_SIZE // 3 + BLOCK_SIZE // 20,
                            BLOCK_SIZE * 9,
@@ -101,415 +192,116 @@ def draw_progress_bar(start_time, score):
     pygame.draw.rect(WIN, PROGRESS_BACK_COLOUR, back_bar)
     top_bar = pygame.Rect(BLOCK_SIZE // 3,
                           BLOCK_SIZE * 11 + BLOCK_SIZE // 3 + BLOCK_SIZE // 20,
-                          int(BLOCK_SIZE * 9 * countdown_percentage),
+                          countdown_width,
                           BLOCK_SIZE // 4)
     pygame.draw.rect(WIN, PROGRESS_TOP_COLOUR, top_bar)
 
 
-def draw_maze(player, player_view):
+def draw_maze(state, player_view, camera):
     """
     draw and update all elements of the maze through out the game
-    :param player: pygame.Rect, player
+    :param state: GameState
     :param player_view: formatted player image
+    :param camera: Camera, view of the world shown on screen
     :return: None
     """
-    # paths
-    for path in paths:
-        WIN.blit(path_view, (path.x, path.y))
-    # treasures
-    for i, treasure in enumerate(treasure_list):
-        if not treasure_collected[i]:
-            WIN.blit(treas_view, (treasure.x, treasure.y))
+    # paths & walls: only the visible window of the static layer
+    view = static_layer_rect.clip(camera.view_rect)
+    WIN.blit(static_layer, camera.apply(view), view.move(-MAZE_ORIGIN, -MAZE_ORIGIN))
+    # treasures, all from the same atlas surface in one call
+    treas_view = assets.treas_view
+    WIN.blits([(treas_view, camera.apply(treasure))
+               for i, treasure in enumerate(state.treasure_list) if not state.treasure_collected[i]], False)
     # player
-    WIN.blit(player_view, (player.x, player.y))
+    WIN.blit(player_view, camera.apply(state.player))
     # trapping walls
-    for i, trap_wall in enumerate(trap_wall_list):
-        if trap_wall_moving_dir[i] == "up":
-            current_trap_wall_view = pygame.transform.rotate(trap_wall_view, 0)
-        elif trap_wall_moving_dir[i] == "down":
-            current_trap_wall_view = pygame.transform.rotate(trap_wall_view, 180)
-        elif trap_wall_moving_dir[i] == "left":
-            current_trap_wall_view = pygame.transform.rotate(trap_wall_view, 90)
-        else:
-            current_trap_wall_view = pygame.transform.rotate(trap_wall_view, 270)
-        WIN.blit(current_trap_wall_view, (trap_wall.x, trap_wall.y))
-    # walls
-    for wall in walls:
-        WIN.blit(wall_view, (wall.x, wall.y))
+    WIN.blits([(render_cache.rotated(assets.trap_wall_view, TRAP_WALL_ANGLE[state.trap_wall_moving_dir[i]]),
+                camera.apply(trap_wall)) for i, trap_wall in enumerate(state.trap_wall_list)], False)
+    # walls in front of the trapping walls sliding into them, copied back from the static layer
+    for trap_wall in state.trap_wall_list:
+        for i, j in state.wall_index.cells_overlapping(trap_wall):
+            if state.wall_index.occupied(i, j):
+                cell = pygame.Rect(i * BLOCK_SIZE, j * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE)
+                WIN.blit(static_layer, camera.apply(cell.move(MAZE_ORIGIN, MAZE_ORIGIN)), cell)
 
 
-def move_maze(keys_pressed, player, player_heading_dir):
+def inputs_from_keys(keys_pressed):
     """
-    transform the position of the maze elements on screen responded to the user input
     :param keys_pressed: dict, dict of keys pressed, a key is pressed if keys_pressed[key] == True
-    :param player: pygame.Rect, player
-    :param player_heading_dir: int, record the direction player is moving towards, up-0, down-1, left-2, right-3
-    :return: player_heading_dir (updated), player_standing_still [Boolean] (updated)
-    """
-    distance = SPEED
-    direction = avoid_collision(player)
-    player_standing_still = True
-    if keys_pressed[KEYBOARD[0]]:  # up
-        if not walls_ahead(player, [0, -1 * SPEED]):
-            direction[1] += distance
-            player_heading_dir = 0
-    if keys_pressed[KEYBOARD[1]]:  # down
-        if not walls_ahead(player, [0, 1 * SPEED]):
-            direction[1] -= distance
-            player_heading_dir = 1
-    if keys_pressed[KEYBOARD[2]]:  # left
-        if not walls_ahead(player, [-1 * SPEED, 0]):
-            direction[0] += distance
-            player_heading_dir = 2
-    if keys_pressed[KEYBOARD[3]]:  # right
-        if not walls_ahead(player, [1 * SPEED, 0]):
-            direction[0] -= distance
-            player_heading_dir = 3
-    # move elements of the maze
-    # walls
-    for wall in walls:
-        wall.x += direction[0]
-        wall.y += direction[1]
-    # paths
-    for path in paths:
-        path.x += direction[0]
-        path.y += direction[1]
-    # treasures
-    for treasure in treasure_list:
-        treasure.x += direction[0]
-        treasure.y += direction[1]
-    # trapping walls
-    for trap_wall in trap_wall_list:
-        trap_wall.x += direction[0]
-        trap_wall.y += direction[1]
-    # update player status if player end up standing still
-    if direction != [0, 0]:
-        player_standing_still = False
-    return player_heading_dir, player_standing_still
-
-
-def walls_ahead(player, dir):
-    """
-    check if player will collide into wall heading to given direction
-    :param player: Rect
-    :param dir: [x, y], direction player's going
-    :return: True/False, if will collide into wall -> return True
+    :return: Inputs, keys held down for GameState.step
     """
-    new_position = pygame.Rect(player.x + dir[0], player.y + dir[1], player.width, player.height)
-    for wall in walls:
-        if new_position.colliderect(wall):
-            return True
-    return False
+    return Inputs(bool(keys_pressed[KEYBOARD[0]]), bool(keys_pressed[KEYBOARD[1]]),
+                  bool(keys_pressed[KEYBOARD[2]]), bool(keys_pressed[KEYBOARD[3]]),
+                  bool(keys_pressed[START_KEY]))
 
 
-def avoid_collision(player):
+def play_sounds(events):
     """
-    adjust direction and player is moving to according to the obstacles
-    :param player: pygame.Rect, player
-    :return: dir, list, [x, y] direction player is moving to
+    play the sound effects of what happened during the last step
+    :param events: list, GameState.events
+    :return: None
     """
-    direction = [0, 0]
-    for wall in walls:
-        if player.colliderect(wall):
-            direction = adjust_dir_to_avoid_collision(player, wall, direction)
-    return direction
+    for event in events:
+        EVENT_SOUNDS[event].play()
 
 
-def adjust_dir_to_avoid_collision(player, wall, dir):
-    """
-    correct the direction player is moving to if player will collide with walls in the maze
-    player can't move trough walls
-    :param player: pygame.Rect, player
-    :param wall: pygame.Rect, block of wall
-    :param dir: list, [x, y] direction player is moving to
-    :return: dir
-    """
-    safe_position = pygame.Rect(player.x, player.y, player.width, player.height)
-    while player.colliderect(wall):
-        safe_position.x -= SPEED
-        if not safe_position.colliderect(wall):
-            dir[0] += SPEED
-            break
-        safe_position.x += 2 * SPEED
-        if not safe_position.colliderect(wall):
-            dir[0] -= SPEED
-            break
-        safe_position.x -= SPEED
-        safe_position.y -= SPEED
-        if not safe_position.colliderect(wall):
-            dir[1] += SPEED
-            break
-        safe_position.y += 2 * SPEED
-        if not safe_position.colliderect(wall):
-            dir[1] -= SPEED
-            break
-    return dir
-
-
-def distribute_treasures(maze):
-    """
-    distribute treasures into the maze
-    :param maze: Maze class object
-    :return: treasure_position
-    """
-    global treasure_list
-    global num_treasures
-    global treasure_collected
-    treasure_positions = []
-    for i in range(TREAS_NUM_PER_ROW):
-        for j in range(TREAS_NUM_PER_ROW):
-            # position relating to maze.list, not on the actual gui
-            position = random_location([TREAS_PADDING + i * TREAS_DENSITY,
-                                                 TREAS_PADDING + j * TREAS_DENSITY],
-                                                [TREAS_PADDING + i * TREAS_DENSITY + TREAS_DENSITY,
-                                                 TREAS_PADDING + j * TREAS_DENSITY + TREAS_DENSITY], maze)
-            treasure_positions.append(position)
-            treasure = pygame.Rect(position[0] * BLOCK_SIZE + 4 * BLOCK_SIZE,
-                                   position[1] * BLOCK_SIZE + 4 * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE)
-            treasure_list.append(treasure)
-    num_treasures = len(treasure_list)
-    treasure_collected = [False for _ in range(num_treasures)]
-    return treasure_positions
-
-
-def collect_treasure(player, score):
-    """
-    record treasures that has been collected by players
-    :param player: pygame.Rect, player
-    :param score: int, number of treasures collected
-    :return: score (updated)
-    """
-    for i, treasure in enumerate(treasure_list):
-        if not treasure_collected[i] and player.colliderect(treasure):
-            score += 1
-            treasure_collected[i] = True
-            COLLECTED_SOUND.play()
-    return score
-
-
-def random_location(top_left, bottom_right, maze):
-    """
-    generate a random position in the range of two input position according to treasure position rule
-    :param top_left: list, [i, j], top left location index
-    :param bottom_right: list, [i, j], bottom right location index
-    :param maze: Maze class object
-    :return: list, [i, j], the random generated location
-    """
-    min_i = top_left[0]
-    max_i = bottom_right[0]
-    min_j = top_left[1]
-    max_j = bottom_right[1]
-    rand_i = randint(min_i, max_i)
-    rand_j = randint(min_j, max_j)
-    while not treasure_position_rule_satisfied(maze, rand_i, rand_j):
-        rand_i = randint(min_i, max_i)
-        rand_j = randint(min_j, max_j)
-    return [rand_i, rand_j]
-
-
-def treasure_position_rule_satisfied(maze, i, j):
-    """
-    rules:
-    1. treasure cannot be in the same position as wall.
-    2. treasure must have walls on either top-bottom or left-right
-    3. treasure can't be near an entrance (a gap on a continuous wall)
-    4. there must be space between any 2 treasures
-    :param maze: maze object
-    :param i: int, 1st index for treasure
-    :param j: int, 2nd index for treasure
-    :return: True if all rules satisfied
-    """
-    # rule 1
-    if maze.list[i][j] == maze.WALL:
-        return False
-    # rule 2
-    if not ((maze.list[i-1][j] == maze.WALL and maze.list[i+1][j] == maze.WALL)
-            or (maze.list[i][j-1] == maze.WALL and maze.list[i][j+1] == maze.WALL)):
-        return False
-    # rule 3
-    if not (maze.list[i-1][j-1] == maze.WALL
-            and maze.list[i+1][j-1] == maze.WALL
-            and maze.list[i-1][j+1] == maze.WALL
-            and maze.list[i+1][j+1] == maze.WALL):
-        return False
-    # rule 4
-    for treasure in treasure_list:
-        if (i - 1 == treasure.x or i + 1 == treasure.x or j - 1 == treasure.y or j + 1 == treasure.y
-                or i - 2 == treasure.x or i + 2 == treasure.x or j - 2 == treasure.y or j + 2 == treasure.y):
-            return False
-    return True
-
-
-def distribute_trapping_walls(maze, treasure_positions):
-    """
-    distribute trapping walls into the maze
-    each trapping wall should be near the corresponded treasure
-    :param maze: Maze class object
-    :param treasure_positions: list, positions of the treausres in maze.list
-    :return: None
-    """
-    global trap_wall_list
-    global trap_wall_moving_dir
-    global trap_wall_last_motion
-    global obstacles
-    trap_wall_positions = []
-    for i in range(len(treasure_list)):
-        position = treasure_positions[i]
-        x, y = position[0], position[1]
-        # check surrounding
-        # up-down walls
-        if maze.list[x-1][y] == maze.WALL and maze.list[x+1][y] == maze.WALL:
-            space_on_left = 0
-            space_on_right = 0
-            cur_x, cur_y = x, y
-            # left
-            while maze.list[cur_x][cur_y] != maze.WALL:
-                cur_y -= 1
-                space_on_left += 1
-            cur_x, cur_y = x, y
-            # right
-            while maze.list[cur_x][cur_y] != maze.WALL:
-                cur_y += 1
-                space_on_right += 1
-            if space_on_left >= space_on_right and space_on_left > 1:
-                trap_wall_positions.append([x, y-1])
-                trap_wall_moving_dir.append("left")
-            elif space_on_left <= space_on_right and space_on_right > 1:
-                trap_wall_positions.append([x, y+1])
-                trap_wall_moving_dir.append("right")
-        elif maze.list[x][y-1] == maze.WALL and maze.list[x][y+1] == maze.WALL:
-            space_on_top = 0
-            space_on_bottom = 0
-            cur_x, cur_y = x, y
-            # up
-            while maze.list[cur_x][cur_y] != maze.WALL:
-                cur_x -= 1
-                space_on_top += 1
-            cur_x, cur_y = x, y
-            # down
-            while maze.list[cur_x][cur_y] != maze.WALL:
-                cur_x += 1
-                space_on_bottom += 1
-            if space_on_top >= space_on_bottom and space_on_top > 1:
-                trap_wall_positions.append([x-1, y])
-                trap_wall_moving_dir.append("up")
-            elif space_on_top <= space_on_bottom and space_on_bottom > 1:
-                trap_wall_positions.append([x+1, y])
-                trap_wall_moving_dir.append("down")
-    for i in range(len(trap_wall_positions)):
-        position = trap_wall_positions[i]
-        trap_wall = pygame.Rect(position[0] * BLOCK_SIZE + 4 * BLOCK_SIZE,
-                                position[1] * BLOCK_SIZE + 4 * BLOCK_SIZE,
-                                BLOCK_SIZE, BLOCK_SIZE)
-        trap_wall_list.append(trap_wall)
-    obstacles += trap_wall_list
-    trap_wall_last_motion = [[] for _ in range(len(trap_wall_list))]
-
-
-def move_trap_walls(counter, current_index):
-    """
-    update trapping walls movements
-    :param counter: int, count number of frames past
-    :param current_index: current index of trap_walls status according to the motion list
-    :return: counter (updated), current_index (updated)
-    """
-    global trap_wall_last_motion
-    motion_list = [0, 0, -(BLOCK_SIZE // 4), -(BLOCK_SIZE // 4), -(BLOCK_SIZE // 4), -(BLOCK_SIZE // 4) - 2,
-                   0, 0, (BLOCK_SIZE // 4), (BLOCK_SIZE // 4), (BLOCK_SIZE // 4), (BLOCK_SIZE // 4) + 2]
-    motion = 0
-    if counter > FPS // 8:
-        current_index = (current_index + 1) % 12
-        motion = motion_list[current_index]
-        counter = 0
-        for i, trap_wall in enumerate(trap_wall_list):
-            if treasure_collected[i] and trap_wall_last_motion[i] != [] and (trap_wall_last_motion[i][-1] == 6
-                                                                             or trap_wall_last_motion[i][-1] == 7):
-                continue
-            elif treasure_collected[i]:
-                trap_wall_last_motion[i].append(current_index)
-            if trap_wall_moving_dir[i] == "up":
-                trap_wall.y += motion
-            elif trap_wall_moving_dir[i] == "down":
-                trap_wall.y -= motion
-            elif trap_wall_moving_dir[i] == "left":
-                trap_wall.x += motion
-            elif trap_wall_moving_dir[i] == "right":
-                trap_wall.x -= motion
-    return counter, current_index
-
-
-def player_killed_by_trap_walls(player, current_trap_wall_status_index, player_killed_music_played):
-    """
-    check if player is killed by the trapping walls
-    :param player: pygame.Rect, player
-    :param current_trap_wall_status_index: int, value == 0, 1, 6, 7 when the wall's in closed position
-    :param player_killed_music_played: Boolean, True if the sound has already been played
-    :return: True if player collide with any of the trap_wall while the wall is in closed status
-    """
-    close_index = [0, 1, 2, 3, 10, 11]
-    for trap_wall in trap_wall_list:
-        if player.colliderect(trap_wall) and current_trap_wall_status_index in close_index:
-            if not player_killed_music_played:
-                PLAYER_KILLED_SOUND.play()
-            return True
-    return False
-
-
-def show_score_page(score, background, highest, average):
+def show_score_page(state, background, highest, average, rank=-1):
     """
     display the end score showing page
-    :param score: int, number of treasures collected
+    :param state: GameState, the finished round
     :param background: pygame.Rect, page background
     :param highest: int, highest score
     :param average: float, the scores' average
+    :param rank: float, share of the games on the same maze with a lower score, not shown if -1
     :return: None
     """
+    score = state.score
+    num_treasures = state.num_treasures
     if background.y > 0:
         background.y -= BLOCK_SIZE // 2
-        WIN.blit(background_view, (background.x, background.y))
+        WIN.blit(assets.background_view, (background.x, background.y))
+        if DIRTY_RECTS:
+            pygame.display.update(background.clip(WIN.get_rect()))
+            return
+    # the finished page doesn't change, in dirty-rect mode it is only drawn once
+    elif DIRTY_RECTS and last_frame.get("score_page"):
+        return
     else:
-        final_score = FINAL_FONT.render(f"{score}/{num_treasures}", 2, FINAL_FONT_COLOUR)
+        last_frame["score_page"] = True
+        final_score = render_cache.text(FINAL_FONT, f"{score}/{num_treasures}", 2, FINAL_FONT_COLOUR)
         WIN.blit(final_score, (LEN // 2 - BLOCK_SIZE - BLOCK_SIZE // 3, LEN // 2 - BLOCK_SIZE * 2))
         # additional text
         if score == num_treasures:
-            additional_text = ADDITIONAL_FONT.render("Congratulations!", 1, ADDITIONAL_FONT_COLOUR)
+            additional_text = render_cache.text(ADDITIONAL_FONT, "Congratulations!", 1, ADDITIONAL_FONT_COLOUR)
 
         elif score >= 5:
-            additional_text = ADDITIONAL_FONT.render("       Not Bad! ", 1, ADDITIONAL_FONT_COLOUR)
+            additional_text = render_cache.text(ADDITIONAL_FONT, "       Not Bad! ", 1, ADDITIONAL_FONT_COLOUR)
         else:
-            additional_text = ADDITIONAL_FONT.render("         Oops!  ", 1, ADDITIONAL_FONT_COLOUR)
+            additional_text = render_cache.text(ADDITIONAL_FONT, "         Oops!  ", 1, ADDITIONAL_FONT_COLOUR)
         WIN.blit(additional_text, (LEN // 2 - BLOCK_SIZE - int(BLOCK_SIZE * 1.7), LEN // 2 - int(BLOCK_SIZE * 3)))
 
         if highest != -1 and average != -1:
-            highest_score = PAST_SCORE_FONT.render(f"Highest Score: {max(highest, score)}/{num_treasures}",
-                                                   1, PAST_SCORES_FONT_COLOUR)
-            average_score = PAST_SCORE_FONT.render(f"Average Score: {round(average, 1)}/{num_treasures}",
-                                                   1, PAST_SCORES_FONT_COLOUR)
+            highest_score = render_cache.text(PAST_SCORE_FONT,
+                                              f"Highest Score: {max(highest, score)}/{num_treasures}",
+                                              1, PAST_SCORES_FONT_COLOUR)
+            average_score = render_cache.text(PAST_SCORE_FONT, f"Average Score: {round(average, 1)}/{num_treasures}",
+                                              1, PAST_SCORES_FONT_COLOUR)
             WIN.blit(highest_score, (LEN // 2 - BLOCK_SIZE * 2, LEN // 2 - BLOCK_SIZE // 2))
             WIN.blit(average_score, (int(LEN // 2 - BLOCK_SIZE * 2.3), LEN // 2 + BLOCK_SIZE // 4))
-        WIN.blit(replay_view, (BLOCK_SIZE * 3, BLOCK_SIZE * 7))
-        WIN.blit(quit_view, (BLOCK_SIZE * 3, int(BLOCK_SIZE * 8.5)))
+        if rank != -1:
+            beaten = render_cache.text(PAST_SCORE_FONT, f"You beat {rank:.0%} of players", 1, PAST_SCORES_FONT_COLOUR)
+            WIN.blit(beaten, (LEN // 2 - beaten.get_width() // 2, LEN // 2 + BLOCK_SIZE))
+        WIN.blit(assets.replay_view, (BLOCK_SIZE * 3, BLOCK_SIZE * 7))
+        WIN.blit(assets.quit_view, (BLOCK_SIZE * 3, int(BLOCK_SIZE * 8.5)))
     pygame.display.update()
 
 
-def scores_list(past_scores):
-    """
-    return a list of integer
-    :param past_scores: list, a list of tuples which each tuple contains and intager
-    :return: list, a list of integer
-    """
-    list = []
-    for t in past_scores:
-        list.append(t[0])
-    return list
-
-
 def update_player_img(counter, current_player_img_index, player_heading_dir, player_standing_still):
     """
     update player img according to the players' motion when walking
     *note: player_heading_dir: 0:up, 1:down, 2:left, 3:right
-    *note: PLAYER_IMG_LIST[player_heading_dir][current_player_img_index]
-    :param counter: int, count up 1 every frame
+    *note: assets.PLAYER_IMG_LIST[player_heading_dir][current_player_img_index]
+    :param counter: int, count up 1 every step
     :param current_player_img_index: int, index from 0-3, player posture
     :param player_heading_dir: int, index from 0-3, player heading direction
     :param player_standing_still: Boolean, true if player doesn't move
@@ -520,40 +312,53 @@ def update_player_img(counter, current_player_img_index, player_heading_dir, pla
         current_player_img_index = (current_player_img_index + 1) % 4
     if player_standing_still:
         current_player_img_index = 1
-    player_view = pygame.transform.scale(PLAYER_IMG_LIST[player_heading_dir][current_player_img_index],
-                                         (BLOCK_SIZE - 2 * CHARACTER_PADDING, BLOCK_SIZE - 2 * CHARACTER_PADDING))
+    player_view = assets.PLAYER_IMG_LIST[player_heading_dir][current_player_img_index]
     return counter, current_player_img_index, player_view
 
 
-def init_database():
+def chunk_layer(world, ci, cj):
     """
-    Create database if not exist
-    :return: None
+    draw the paths and walls of a chunk once, and keep them while the chunk is on screen
+    :param world: ChunkedWorld
+    :param ci: int, chunk index along x
+    :param cj: int, chunk index along y
+    :return: pygame.Surface, the chunk, its top left corner is cell (0, 0) of the chunk
     """
-    conn = sqlite3.connect("scores.db")
-    cur = conn.cursor()
-    cur.execute("CREATE TABLE IF NOT EXISTS scores(past_scores)")
-    conn.commit()
-    conn.close()
+    key = (world.seed, ci, cj)
+    if key in chunk_layers:
+        chunk_layers.move_to_end(key)
+        return chunk_layers[key]
+    cells = world.chunk(ci, cj)
+    size = world.chunk_size
+    layer = pygame.Surface((size * BLOCK_SIZE, size * BLOCK_SIZE))
+    layer.fill(BACKGROUND_COLOUR)
+    layer.blits([(assets.wall_view if cells[i * size + j] == Maze.WALL_CELL else assets.path_view,
+                  (i * BLOCK_SIZE, j * BLOCK_SIZE)) for i in range(size) for j in range(size)], False)
+    chunk_layers[key] = layer
+    if len(chunk_layers) > CHUNK_LAYERS:
+        chunk_layers.popitem(last=False)
+    return layer
 
 
-def update_database(score):
+def draw_world(state, player_view, camera):
     """
-    insert current score into database, and load all past scores to calculate and return the all time high and average.
-    :param score: int, current score
-    :return: int, float: highest_score, average
+    draw the exploration mode: the chunks on screen and the player
+    :param state: ExploreState
+    :param player_view: pygame.image, formatted player image
+    :param camera: Camera, view of the world shown on screen
+    :return: None
     """
-    conn = sqlite3.connect("scores.db")
-    cur = conn.cursor()
-    cur.execute("INSERT INTO scores(past_scores) VALUES (?)", (score,))  # add current score
-    cur.execute("SELECT * FROM scores")
-    past_scores = scores_list(cur.fetchall())
-    conn.commit()
-    conn.close()
-    # past score data
-    highest_score = max(past_scores)
-    average = sum(past_scores) / len(past_scores)
-    return highest_score, average
+    world = state.world
+    span = world.chunk_size * BLOCK_SIZE
+    WIN.fill(BACKGROUND_COLOUR)
+    for ci, cj in world.chunks_near(pygame.Rect(camera.view_rect), margin=0):
+        chunk = pygame.Rect(ci * span + MAZE_ORIGIN, cj * span + MAZE_ORIGIN, span, span)
+        WIN.blit(chunk_layer(world, ci, cj), camera.apply(chunk))
+    WIN.blit(player_view, camera.apply(state.player))
+    # display start-game guide if game has not started
+    if not state.started:
+        WIN.blit(assets.guide_view, (0, 0))
+    pygame.display.update()
 
 
 def check_button_restart_game(x, y):
@@ -564,8 +369,8 @@ def check_button_restart_game(x, y):
     :return: None
     """
     if BLOCK_SIZE * 3 <= x <= BLOCK_SIZE * 8 and BLOCK_SIZE * 7 <= y <= BLOCK_SIZE * 8:
-        WIN.blit(pressed_replay_view, (BLOCK_SIZE * 3, BLOCK_SIZE * 7))
-        BUTTON_SOUND.play()
+        WIN.blit(assets.pressed_replay_view, (BLOCK_SIZE * 3, BLOCK_SIZE * 7))
+        assets.BUTTON_SOUND.play()
         pygame.display.update()
         pygame.time.delay(200)
         new_maze = Maze(MAZE_SIZE)
@@ -581,114 +386,103 @@ def check_button_quit_game(x, y):
     """
     if (BLOCK_SIZE * 3 <= x <= BLOCK_SIZE * 8
             and int(BLOCK_SIZE * 8.5) <= y <= int(BLOCK_SIZE * 9.5)):
-        WIN.blit(pressed_quit_view, (BLOCK_SIZE * 3, BLOCK_SIZE * 8.5))
-        BUTTON_SOUND.play()
+        WIN.blit(assets.pressed_quit_view, (BLOCK_SIZE * 3, BLOCK_SIZE * 8.5))
+        assets.BUTTON_SOUND.play()
         pygame.display.update()
         pygame.time.delay(200)
+        close_score_service()
         pygame.quit()
         sys.exit()
 
 
-def check_times_up(start_time, sound_played):
+def run_steps(state, steps, next_inputs, player_img, recorder=None):
     """
-    check if times almost up and play the game ending sound.
-    :param start_time:
-    :param sound_played:
-    :return:
+    run the steps of the round due for this frame, the player img changes with the steps so it walks at game speed
+    :param state: GameState
+    :param steps: int, number of steps due, see FixedTimestep.advance
+    :param next_inputs: function, returns the Inputs of the next step, None if there are no more
+    :param player_img: (counter, current_player_img_index, player_view), player img status
+    :param recorder: InputRecorder, records the inputs of every step, None to not record them
+    :return: snapshot of the state before the last step (None if no step ran), player img status (updated)
     """
-    if (not sound_played
-            and (start_time + timedelta(minutes=TIME) - timedelta(seconds=1.5))
-            < datetime.now() < (start_time + timedelta(minutes=TIME))):
-        TIMES_UP_SOUND.play()
-        sound_played = True
-    return sound_played
+    previous = None
+    for _ in range(steps):
+        if state.game_over:
+            break
+        inputs = next_inputs()
+        if inputs is None:
+            break
+        previous = snapshot(state)
+        if recorder is not None:
+            recorder.record(inputs)
+        state.step(inputs)
+        play_sounds(state.events)
+        if state.started:
+            counter, current_player_img_index, _ = player_img
+            player_img = update_player_img(counter + 1, current_player_img_index,
+                                           state.player_heading_dir, state.player_standing_still)
+    return previous, player_img
 
 
 def main(maze):
-    # reset game parameters for replay function
-    walls.clear()
-    paths.clear()
-    treasure_list.clear()
-    trap_wall_list.clear()
-    trap_wall_moving_dir.clear()
-    score = 0
+    last_frame.clear()
     clock = pygame.time.Clock()
     # prepare game
-    init_maze(maze)
-    treasure_positions = distribute_treasures(maze)
-    distribute_trapping_walls(maze, treasure_positions)
-    player = pygame.Rect(5 * BLOCK_SIZE + CHARACTER_PADDING,
-                         5 * BLOCK_SIZE + CHARACTER_PADDING,
-                         BLOCK_SIZE - 2 * CHARACTER_PADDING,
-                         BLOCK_SIZE - 2 * CHARACTER_PADDING)
-    database_accessed = False
+    state = GameState(maze)
+    # keys of every step, saved with the score so the round can be played back
+    recorder = InputRecorder(maze)
+    # the database opens on the writer thread while the round is played
+    service = get_score_service()
+    bake_static_layer(state)
+    camera = Camera(LEN, LEN)
+    stats = None
     highest_score = -1
     average = -1
+    rank = -1
     # final score display page background
     background = pygame.Rect(0, BLOCK_SIZE * 12, BLOCK_SIZE * 11, BLOCK_SIZE * 12)
-    # player img status
-    player_counter = 0  # count how many frame has past
-    current_player_img_index = 1  # standing still
-    player_heading_dir = 1  # right
-    player_view = pygame.transform.scale(PLAYER_IMG_LIST[player_heading_dir][current_player_img_index],
-                                         (BLOCK_SIZE - 2 * CHARACTER_PADDING, BLOCK_SIZE - 2 * CHARACTER_PADDING))
-    player_killed = False
-    # trap walls time count
-    trap_wall_counter = 0
-    current_trap_wall_status_index = 0
-    # start game control & countdown
-    start_game = False
-    start_time = datetime.now()
-    times_up_sound_played = False
+    # player img status: frame counter, posture (standing still), img
+    player_img = (0, 1, assets.PLAYER_IMG_LIST[state.player_heading_dir][1])
+    # the round steps at FPS on the game clock, frames are drawn at most at RENDER_FPS in between
+    timestep = FixedTimestep()
+    previous = snapshot(state)
     # game loop
     while True:
         game_ended = False
         # Frame rate
-        clock.tick(FPS)
+        clock.tick(RENDER_FPS)
+        steps = timestep.advance()
         # if during game
-        if (len(treasure_list) != 0 and datetime.now() < start_time + timedelta(minutes=TIME)
-                and not player_killed):
-            # times up sound effect
-            times_up_sound_played = check_times_up(start_time, times_up_sound_played)
-            player_killed = player_killed_by_trap_walls(player, current_trap_wall_status_index, player_killed)
-            keys_pressed = pygame.key.get_pressed()
-            # start game
-            if not start_game and not keys_pressed[START_KEY]:
-                start_time = datetime.now()
-            if not start_game and keys_pressed[START_KEY]:
-                start_game = True
-                start_time = datetime.now()
-                START_GAME_SOUND.play()
-            elif start_game:
-                # update maze
-                player_heading_dir, player_standing_till = move_maze(keys_pressed, player, player_heading_dir)
-                trap_wall_counter += 1
-                trap_wall_counter, current_trap_wall_status_index = move_trap_walls(trap_wall_counter,
-                                                                                    current_trap_wall_status_index)
-                # update player img status
-                player_counter += 1
-                player_counter, current_player_img_index, player_view = update_player_img(player_counter,
-                                                                                current_player_img_index,
-                                                                                player_heading_dir,
-                                                                                player_standing_till)
-                # update score
-                score = collect_treasure(player, score)
+        if not state.game_over:
+            inputs = inputs_from_keys(pygame.key.get_pressed())
+            last, player_img = run_steps(state, steps, lambda: inputs, player_img, recorder)
+            if last is not None:
+                previous = last
+            # the frame shows the round between the last step and the next one
+            view = InterpolatedState(state, previous, timestep.alpha)
+            # keep the player at the same place on screen
+            camera.follow(view.player, PLAYER_START, PLAYER_START)
             # update game view
-            draw_game(player, start_time, score, player_view, start_game)
+            draw_game(view, player_img[2], camera)
         # if game ends
         else:
-            if not database_accessed:
-                # update score to database & fetch past scores
-                init_database()
-                highest_score, average = update_database(score)
-                database_accessed = True
+            if stats is None:
+                # save the score & fetch past scores on the score writer, shown once they are back
+                stats = service.submit(state.score, state.maze.size, state.num_treasures,
+                                       recorder.to_bytes(state.score))
+            elif highest_score == -1 and stats.done() and stats.exception() is None:
+                highest_score, average, rank = stats.result()
+                # the finished page is drawn again with them
+                last_frame.pop("score_page", None)
             game_ended = True
-            # display score page
-            show_score_page(score, background, highest_score, average)
+            # display score page, it slides in at game speed
+            if steps:
+                show_score_page(state, background, highest_score, average, rank)
         # control
         for event in pygame.event.get():
             # quit game
             if event.type == pygame.QUIT:
+                close_score_service()
                 pygame.quit()
                 sys.exit()
             # button clicks
@@ -700,5 +494,77 @@ def main(maze):
                 check_button_quit_game(mouse_x, mouse_y)
 
 
+def watch_replay(log, speed=1):
+    """
+    show a recorded round, played back from its input log, then its score page
+    :param log: InputLog
+    :param speed: float, playback speed, 1 for real time
+    :return: None
+    """
+    last_frame.clear()
+    clock = pygame.time.Clock()
+    state = GameState(log.maze())
+    bake_static_layer(state)
+    camera = Camera(LEN, LEN)
+    background = pygame.Rect(0, BLOCK_SIZE * 12, BLOCK_SIZE * 11, BLOCK_SIZE * 12)
+    player_img = (0, 1, assets.PLAYER_IMG_LIST[state.player_heading_dir][1])
+    # the game clock runs speed times faster
+    timestep = FixedTimestep(1 / (FPS * speed), max(MAX_FRAME_STEPS, int(MAX_FRAME_STEPS * speed)))
+    previous = snapshot(state)
+    inputs = log.inputs()
+    while True:
+        clock.tick(RENDER_FPS)
+        steps = timestep.advance()
+        if not state.game_over:
+            last, player_img = run_steps(state, steps, lambda: next(inputs, None), player_img)
+            if last is not None:
+                previous = last
+            view = InterpolatedState(state, previous, timestep.alpha)
+            camera.follow(view.player, PLAYER_START, PLAYER_START)
+            draw_game(view, player_img[2], camera)
+        elif steps:
+            show_score_page(state, background, -1, -1)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                close_score_service()
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.MOUSEBUTTONDOWN and state.game_over:
+                mouse_x, mouse_y = event.pos
+                check_button_restart_game(mouse_x, mouse_y)
+                check_button_quit_game(mouse_x, mouse_y)
+
+
+def explore(world):
+    """
+    game loop of the exploration mode, it goes on until the window is closed
+    :param world: ChunkedWorld
+    :return: None
+    """
+    clock = pygame.time.Clock()
+    state = ExploreState(world)
+    camera = Camera(LEN, LEN)
+    player_img = (0, 1, assets.PLAYER_IMG_LIST[state.player_heading_dir][1])
+    timestep = FixedTimestep()
+    previous = snapshot(state)
+    while True:
+        clock.tick(RENDER_FPS)
+        inputs = inputs_from_keys(pygame.key.get_pressed())
+        last, player_img = run_steps(state, timestep.advance(), lambda: inputs, player_img)
+        if last is not None:
+            previous = last
+        view = InterpolatedState(state, previous, timestep.alpha)
+        camera.follow(view.player, PLAYER_START, PLAYER_START)
+        draw_world(view, player_img[2], camera)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                close_score_service()
+                pygame.quit()
+                sys.exit()
+
+
 if __name__ == "__main__":
-    main(Maze(MAZE_SIZE))
+    if "--explore" in sys.argv[1:]:
+        explore(ChunkedWorld())
+    else:
+        main(Maze(MAZE_SIZE))
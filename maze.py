@@ -6,7 +6,60 @@ Author: Allyn Bao
 Date last modified: 9/9/2021
 """
 
-from random import randint
+import random
+
+
+class MazeRow:
+    """
+    read-only view of one row of a Maze grid, indexes give back the Maze.WALL / Maze.PATH labels
+    """
+
+    def __init__(self, grid, start, size):
+        self._grid = grid
+        self._start = start
+        self._size = size
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, j):
+        if isinstance(j, slice):
+            return [self[k] for k in range(self._size)[j]]
+        if j < 0:
+            j += self._size
+        if not 0 <= j < self._size:
+            raise IndexError("maze row index out of range")
+        return Maze.LABELS[self._grid[self._start + j]]
+
+    def __iter__(self):
+        for code in self._grid[self._start:self._start + self._size]:
+            yield Maze.LABELS[code]
+
+
+class MazeRows:
+    """
+    read-only 2-D view of a Maze grid, keeps the old maze.list[i][j] lookups working
+    """
+
+    def __init__(self, grid, size):
+        self._grid = grid
+        self._size = size
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(self._size)[i]]
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("maze index out of range")
+        return MazeRow(self._grid, i * self._size, self._size)
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield MazeRow(self._grid, i * self._size, self._size)
 
 
 class Maze:
@@ -17,12 +70,21 @@ class Maze:
     PLAYER = "@"
     TREAS = "$"
 
-    def __init__(self, size):
+    # cell codes stored in self.grid
+    PATH_CELL = 0
+    WALL_CELL = 1
+    LABELS = (PATH, WALL)
+
+    def __init__(self, size, seed=None):
         """
         initialize the maze map
         :param size: int, the length of the square maze map with frame without outer paddings
+        :param seed: int, the same seed always gives the same maze, a random one is picked if None
         self.size = size (if size is valid) size = 1 + 2 * n where n is positive int
-        self.list: list, store the information of the maze in a 2-D array
+        self.seed: int, seed the maze is generated from
+        self.random: random.Random, owned by the maze, so mazes can be generated in parallel and reproduced
+        self.grid: bytearray, store the information of the maze row by row, one cell code per byte,
+                   cell (i, j) is at self.grid[i * self.size + j]
         """
         # check maze size
         if 10 < size < 60 and (size - 1) % 2 == 0:
@@ -30,228 +92,188 @@ class Maze:
         else:
             raise ValueError
 
-        self.list = [[self.PATH for _ in range(self.size)] for _ in range(self.size)]
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.random = random.Random(self.seed)
+        self.grid = bytearray(self.size * self.size)
         self.generate_maze()
 
+    @classmethod
+    def from_grid(cls, size, grid, seed=None):
+        """
+        create a maze on top of an existing grid, without generating a new one
+        :param size: int, the length of the square maze map
+        :param grid: bytearray (or any object indexed like self.grid), the cell codes row by row
+        :param seed: int, seed the grid was generated from, None if unknown
+        :return: Maze class object
+        """
+        if len(grid) != size * size:
+            raise ValueError
+        maze = cls.__new__(cls)
+        maze.size = size
+        maze.seed = seed
+        maze.random = random.Random(seed)
+        maze.grid = grid
+        return maze
+
     def __str__(self):
-        string = ""
-        for line in self.list:
-            string += ("".join(line)) + "\n"
-        return string[:-1]
+        labels = [self.LABELS[code] for code in self.grid]
+        return "\n".join("".join(labels[i:i + self.size]) for i in range(0, len(labels), self.size))
+
+    @property
+    def list(self):
+        """
+        read-only 2-D view of the maze, maze.list[i][j] is self.WALL or self.PATH
+        :return: MazeRows
+        """
+        return MazeRows(self.grid, self.size)
+
+    def is_wall(self, i, j):
+        """
+        :param i: int, row index
+        :param j: int, column index
+        :return: True if cell (i, j) is a wall
+        """
+        return self.grid[i * self.size + j] == self.WALL_CELL
 
     def generate_maze(self):
         """
-        add walls to the maze map: through modifying self.list
+        add walls to the maze map: through modifying self.grid
         :return: None
         """
+        size = self.size
+        grid = self.grid
+        wall_line = bytes([self.WALL_CELL]) * size
         #add frame
         #top
-        self.list[0] = [self.WALL for _ in range(self.size)]
+        grid[0:size] = wall_line
         #bottom
-        self.list[self.size-1] = [self.WALL for _ in range(self.size)]
+        grid[(size - 1) * size:] = wall_line
         #left & right
-        for i in range(self.size):
-            self.list[i][0] = self.WALL
-            self.list[i][self.size-1] = self.WALL
+        grid[0::size] = wall_line
+        grid[size - 1::size] = wall_line
         #draw inner walls
-        self.list = self.division_generator(self.list, [])
+        self.division_engine()
 
-    def division_generator(self, chamber, entrances):
+    def division_engine(self):
         """
-        Recursive division maze generator
-        :param chamber: list, store the partial map / chamber of the maze
-        :param entrances: list, a list of location of all the gaps on the outer wall
-        :return: list, new map list with inner wall finished
+        Iterative, in-place recursive division maze generator
+        keeps the chambers to divide on an explicit stack as bounds (top, left, height, width) and writes the
+        walls straight into self.grid, top left chamber first, as a recursion would.
+        :return: None
         """
-        height = len(chamber)
-        width = len(chamber[0])
-        # base case
-        if height == 3 or width == 3:
-            return chamber
-        # one wall needed to add in the middle
-        elif height == 5:
-            # WWWWWWWWWWWW
-            # W..........W
-            # ...........W
-            # W...........<-entrance
-            # WWWWWWWWWWWW
-            # check if the entrance to the chamber is in the middle where the inner wall will be added
-            middle_entrance_on_left = False
-            middle_entrance_on_right = False
-            for entrance in entrances:
-                if entrance == [2, 0]:
-                    middle_entrance_on_left = True
-                elif entrance == [2, width - 1]:
-                    middle_entrance_on_right = True
-            #draw middle wall
-            # WWWWWWWWWWWW
-            # W..........W
-            # ..WWWWW.WWWW
-            # W...........
-            # WWWWWWWWWWWW
-            for i in range(width)[1:-1]:
-                if not ((i == 1 and middle_entrance_on_left) or (i == width - 2 and middle_entrance_on_right)):
-                    chamber[2][i] = self.WALL
-            # add entrance on middle wall
-            if width == 5:
-                chamber[2][2] = self.PATH
-            # add entrance on middle wall if the wall is long enough
-            elif width > 5:
-                n = randint(1, width - 2)
-                chamber[2][n] = self.PATH
-            return chamber
-        elif width == 5:
-            # WW.WW
-            # W...W
-            # W...W
-            # W...W
-            # W...W
-            # W...W
-            # W...W
-            # WWW.W
-            # check for the existence of the middle entrances
-            middle_entrance_on_top = False
-            middle_entrance_on_bottom = False
-            for entrance in entrances:
-                if entrance == [0, 2]:
-                    middle_entrance_on_top = True
-                elif entrance == [height - 1, 2]:
-                    middle_entrance_on_bottom = True
-            # draw the middle wall
-            for i in range(height)[1:-1]:
-                if not ((i == 1 and middle_entrance_on_top) or (i == height - 2 and middle_entrance_on_bottom)):
-                    chamber[i][2] = self.WALL
-            # add entrance on middle wall
-            if height == 5:
-                chamber[2][2] = self.PATH
-            # add entrance on middle wall if the wall is long enough
-            elif height > 5:
-                n = randint(1, width - 2)
-                chamber[n][2] = self.PATH
-            return chamber
-        # large chamber - needs vertical as well as horizontal division
-        elif height >= 7 and width >= 7:
-            # WWWWW.WWWWWWW
-            # W...........W
-            # W...........W
-            # W............
-            # W...........W
-            # ............W
-            # W...........W
-            # WWWWWWWW.WWWW
-            # locate all entrances
-            top_entrance = 0
-            bottom_entrance = 0
-            left_entrance = 0
-            right_entrance = 0
-            for entrance in entrances:
-                if entrance[0] == 0:  # top
-                    top_entrance = entrance[1]
-                elif entrance[0] == height - 1:  # bottom
-                    bottom_entrance = entrance[1]
-                elif entrance[1] == 0:
-                    left_entrance = entrance[0]
-                elif entrance[1] == 0:
-                    right_entrance = entrance[0]
-            # generate random wall position
-            vertical_wall_index = Maze.random_wall_position(2, width - 3, [top_entrance, bottom_entrance])
-            horizontal_wall_index = Maze.random_wall_position(2, height - 3, [left_entrance, right_entrance])
-            # add Walls
-            # vertical wall
-            for i in range(height)[1:-1]:
-                chamber[i][vertical_wall_index] = self.WALL
-            for i in range(width)[1:-1]:
-                chamber[horizontal_wall_index][i] = self.WALL
-            # add inner entrances
-            if horizontal_wall_index > 2:
-                top_half_entrance_index = Maze.random_path_position(1, horizontal_wall_index - 1)
-                chamber[top_half_entrance_index][vertical_wall_index] = self.PATH
-            else:
-                chamber[1][vertical_wall_index] = self.PATH
-            if height - horizontal_wall_index > 2:
-                bottom_half_entrance_index = Maze.random_path_position(horizontal_wall_index + 1, height - 2)
-                chamber[bottom_half_entrance_index][vertical_wall_index] = self.PATH
-            else:
-                chamber[height-2][vertical_wall_index] = self.PATH
-            if vertical_wall_index > 2:
-                left_half_entrance_index = Maze.random_path_position(1, vertical_wall_index - 1)
-                chamber[horizontal_wall_index][left_half_entrance_index] = self.PATH
-            else:
-                chamber[horizontal_wall_index][1] = self.PATH
-            if width - vertical_wall_index > 2:
-                right_half_entrance_index = Maze.random_path_position(vertical_wall_index + 1, width - 2)
-                chamber[horizontal_wall_index][right_half_entrance_index] = self.PATH
-            else:
-                chamber[horizontal_wall_index][width - 2] = self.PATH
-            # chambers
-            top_left = []
-            top_right = []
-            bottom_left = []
-            bottom_right = []
-            # top_left
-            for row in chamber[:horizontal_wall_index + 1]:
-                top_left.append(row[:vertical_wall_index + 1])
-            for row in chamber[horizontal_wall_index:]:
-                bottom_left.append(row[:vertical_wall_index + 1])
-            for row in chamber[:horizontal_wall_index + 1]:
-                top_right.append(row[vertical_wall_index:])
-            for row in chamber[horizontal_wall_index:]:
-                bottom_right.append(row[vertical_wall_index:])
-            # further division
-            new_top_left = self.division_generator(top_left, self.find_all_entrances(top_left))
-            new_top_right = self.division_generator(top_right, self.find_all_entrances(top_right))
-            new_bottom_left = self.division_generator(bottom_left, self.find_all_entrances(bottom_left))
-            new_bottom_right = self.division_generator(bottom_right, self.find_all_entrances(bottom_right))
-            # pieces it back
-            new_chamber = []
-            for i in range(len(new_top_left))[:-1]:
-                new_chamber.append(new_top_left[i] + new_top_right[i][1:])
-            for i in range(len(new_bottom_left)):
-                new_chamber.append(new_bottom_left[i] + new_bottom_right[i][1:])
-            return new_chamber
+        grid = self.grid
+        size = self.size
+        wall = self.WALL_CELL
+        path = self.PATH_CELL
+        stack = [(0, 0, self.size, self.size)]
+        while stack:
+            top, left, height, width = stack.pop()
+            # index of the top left corner of the chamber
+            corner = top * size + left
+            bottom = corner + (height - 1) * size
+            # base case
+            if height == 3 or width == 3:
+                continue
+            # one horizontal wall needed to add in the middle
+            # (inner cells of a chamber are all paths before it gets divided)
+            elif height == 5:
+                row = corner + 2 * size
+                grid[row + 1:row + width - 1] = bytes([wall]) * (width - 2)
+                # keep the gaps in front of entrances on the middle of the sides
+                if grid[row] == path:
+                    grid[row + 1] = path
+                if grid[row + width - 1] == path:
+                    grid[row + width - 2] = path
+                # add entrance on middle wall
+                if width == 5:
+                    grid[row + 2] = path
+                elif width > 5:
+                    grid[row + self.random.randint(1, width - 2)] = path
+            # one vertical wall needed to add in the middle
+            elif width == 5:
+                column = corner + 2
+                grid[column + size:column + (height - 1) * size:size] = bytes([wall]) * (height - 2)
+                # keep the gaps in front of entrances on the middle of the top and bottom
+                if grid[column] == path:
+                    grid[column + size] = path
+                if grid[column + (height - 1) * size] == path:
+                    grid[column + (height - 2) * size] = path
+                # add entrance on middle wall (offset drawn from the width)
+                if height > 5:
+                    grid[column + self.random.randint(1, width - 2) * size] = path
+            # large chamber - needs vertical as well as horizontal division
+            elif height >= 7 and width >= 7:
+                # locate the last entrance on top, bottom and left side (right side is never checked)
+                top_entrance = 0
+                bottom_entrance = 0
+                left_entrance = 0
+                for i in range(width):
+                    if grid[corner + i] == path:
+                        top_entrance = i
+                    if grid[bottom + i] == path:
+                        bottom_entrance = i
+                for i in range(1, height - 1):
+                    if grid[corner + i * size] == path:
+                        left_entrance = i
+                # generate random wall position
+                vertical = self.random_wall_position(2, width - 3, [top_entrance, bottom_entrance])
+                horizontal = self.random_wall_position(2, height - 3, [left_entrance, 0])
+                # add walls
+                column = corner + vertical
+                row = corner + horizontal * size
+                grid[column + size:column + (height - 1) * size:size] = bytes([wall]) * (height - 2)
+                grid[row + 1:row + width - 1] = bytes([wall]) * (width - 2)
+                # add inner entrances
+                if horizontal > 2:
+                    grid[column + self.random_path_position(1, horizontal - 1) * size] = path
+                else:
+                    grid[column + size] = path
+                if height - horizontal > 2:
+                    grid[column + self.random_path_position(horizontal + 1, height - 2) * size] = path
+                else:
+                    grid[column + (height - 2) * size] = path
+                if vertical > 2:
+                    grid[row + self.random_path_position(1, vertical - 1)] = path
+                else:
+                    grid[row + 1] = path
+                if width - vertical > 2:
+                    grid[row + self.random_path_position(vertical + 1, width - 2)] = path
+                else:
+                    grid[row + width - 2] = path
+                # further division: pushed in reverse so top left is divided first
+                stack.append((top + horizontal, left + vertical, height - horizontal, width - vertical))
+                stack.append((top + horizontal, left, height - horizontal, vertical + 1))
+                stack.append((top, left + vertical, horizontal + 1, width - vertical))
+                stack.append((top, left, horizontal + 1, vertical + 1))
 
-    @staticmethod
-    def random_wall_position(min, max, num_to_avoid):
+    def random_wall_position(self, min, max, num_to_avoid):
         """
         generate a radom number n where min <= n <= max and n is Even number and n not in num_to_avoid
+        the number is drawn directly from the valid ones, without retrying
         :param min: int, min value, min >= 0
         :param max: int, max value
         :param num_to_avoid: list of int
         :return: int
         """
-        n = -1
-        while n < min or n in num_to_avoid or n % 2 != 0:
-            n = randint(min, max)
+        first = min + min % 2
+        avoid = sorted(set(n for n in num_to_avoid if first <= n <= max and n % 2 == 0))
+        count = (max - first) // 2 + 1 - len(avoid)
+        if count <= 0:
+            raise ValueError("no even number left between %d and %d" % (min, max))
+        n = first + 2 * self.random.randrange(count)
+        # skip over the numbers to avoid, in increasing order
+        for a in avoid:
+            if n >= a:
+                n += 2
         return n
 
-    @staticmethod
-    def random_path_position(min, max):
+    def random_path_position(self, min, max):
         """
         return a random int n where min <= n <= max and n is a Odd number
+        the number is drawn directly from the odd ones, without retrying
         :param min: int, min value, min >= 0
         :param max: int, max value
         :return: int
         """
-        n = -1
-        while n < min or n % 2 == 0:
-            n = randint(min, max)
-        return n
-
-    def find_all_entrances(self, chamber):
-        """
-        find all entrances on the sides of the chamber and return a list of all location of the entrances
-        :param chamber: 2-D list
-        :return: list, contain location of all entrances
-        """
-        entrances = []
-        for i in range(len(chamber[0])):
-            if chamber[0][i] == self.PATH:
-                entrances.append([0, i])
-            if chamber[len(chamber)-1][i] == self.PATH:
-                entrances.append([len(chamber)-1, i])
-        for i in range(len(chamber)):
-            if chamber[i][0] == self.PATH:
-                entrances.append([i, 0])
-            if chamber[i][len(chamber[0])-1] == self.PATH:
-                entrances.append([i, len(chamber[0])-1])
-        return entrances
+        first = min + 1 - min % 2
+        return first + 2 * self.random.randrange((max - first) // 2 + 1)
@@ -0,0 +1,230 @@
+"""
+maze_file.py
+This file contains the binary maze file format, its writer, and MazeFile class which reads it.
+
+A file is a sequence of maze records, each one is a 24 bytes header followed by the cells, 1 bit per cell:
+    header: magic b"MZ", version (u8), algorithm (u8), flags (u8), 3 bytes padding,
+            height (u32), width (u32), seed (u64), little endian
+    cells:  row by row, each row packed into (width + 7) // 8 bytes, first cell in the highest bit, 1 is a wall
+The reader maps the file into memory, and opens the k-th maze on top of the mapped bytes without copying them
+or parsing the cells of the other mazes.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import mmap
+import struct
+from maze import Maze
+
+MAGIC = b"MZ"
+VERSION = 1
+HEADER = struct.Struct("<2sBBB3xIIQ")
+# algorithm that generated the maze
+ALGORITHMS = {"division": 0, "eller": 1}
+# flags
+HAS_SEED = 1
+
+# byte of 8 cell codes -> the 8 bits of a packed byte, as "0"/"1" text
+_CELL_TO_BIT = bytes.maketrans(bytes([Maze.PATH_CELL, Maze.WALL_CELL]), b"01")
+
+
+def row_bytes(width):
+    """
+    :param width: int, number of cells in a row
+    :return: int, number of bytes of a packed row
+    """
+    return (width + 7) // 8
+
+
+def pack_row(cells):
+    """
+    pack a row of cell codes into bits
+    :param cells: bytes or bytearray, one cell code per byte
+    :return: bytes, 1 bit per cell, padded with 0 bits to full bytes
+    """
+    length = row_bytes(len(cells))
+    bits = int(bytes(cells).translate(_CELL_TO_BIT), 2) << (length * 8 - len(cells))
+    return bits.to_bytes(length, "big")
+
+
+def unpack_row(data, width):
+    """
+    unpack a packed row into cell codes
+    :param data: bytes-like, packed row
+    :param width: int, number of cells in the row
+    :return: bytearray, one cell code per byte
+    """
+    bits = bin(int.from_bytes(data, "big") | (1 << len(data) * 8))[3:3 + width]
+    return bytearray(bits.encode().translate(bytes.maketrans(b"01", bytes([Maze.PATH_CELL, Maze.WALL_CELL]))))
+
+
+def pack_header(height, width, seed=None, algorithm="division"):
+    """
+    :param height: int, number of rows
+    :param width: int, number of cells in a row
+    :param seed: int, seed the maze was generated from, None if unknown
+    :param algorithm: str, name of the algorithm in ALGORITHMS
+    :return: bytes, record header
+    """
+    flags = HAS_SEED if seed is not None else 0
+    return HEADER.pack(MAGIC, VERSION, ALGORITHMS[algorithm], flags, height, width, seed or 0)
+
+
+def pack_maze(maze, algorithm="division"):
+    """
+    :param maze: Maze class object, its seed is stored in the header
+    :param algorithm: str, name of the algorithm in ALGORITHMS
+    :return: bytes, the whole record of the maze
+    """
+    size = maze.size
+    grid = maze.grid
+    rows = [pack_row(grid[i:i + size]) for i in range(0, size * size, size)]
+    return pack_header(size, size, maze.seed, algorithm) + b"".join(rows)
+
+
+def write_maze(output, maze, algorithm="division"):
+    """
+    append a maze to a binary file
+    :param output: file object, opened for writing bytes
+    :param maze: Maze class object, its seed is stored in the header
+    :param algorithm: str, name of the algorithm in ALGORITHMS
+    :return: None
+    """
+    output.write(pack_maze(maze, algorithm))
+
+
+class BitGrid:
+    """
+    read-only grid of cell codes on top of packed rows, indexes like Maze.grid: cell (i, j) is at i * width + j
+    """
+
+    def __init__(self, buffer, height, width):
+        """
+        :param buffer: memoryview, the packed rows
+        :param height: int, number of rows
+        :param width: int, number of cells in a row
+        """
+        self.buffer = buffer
+        self.height = height
+        self.width = width
+        self.row_bytes = row_bytes(width)
+
+    def __len__(self):
+        return self.height * self.width
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return bytearray(self[i] for i in range(len(self))[k])
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError("grid index out of range")
+        i, j = divmod(k, self.width)
+        return (self.buffer[i * self.row_bytes + (j >> 3)] >> (7 - (j & 7))) & 1
+
+    def __iter__(self):
+        for i in range(self.height):
+            yield from self.row(i)
+
+    def row(self, i):
+        """
+        :param i: int, row index
+        :return: bytearray, cell codes of row i
+        """
+        start = i * self.row_bytes
+        return unpack_row(self.buffer[start:start + self.row_bytes], self.width)
+
+
+class MazeFile:
+
+    def __init__(self, path):
+        """
+        map a maze file into memory
+        :param path: str, path of the file
+        self.offsets: list, position of the records found so far, filled on demand
+        """
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        self.offsets = []
+        self._end = 0  # where the next unknown record starts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        close the file, mazes still open on top of it keep the mapping alive until they are gone
+        :return: None
+        """
+        self.file.close()
+        try:
+            self.view.release()
+            self.map.close()
+        except BufferError:
+            pass
+
+    def __len__(self):
+        self._find(None)
+        return len(self.offsets)
+
+    def __getitem__(self, k):
+        """
+        :param k: int, index of the maze in the file
+        :return: Maze class object, its grid reads the mapped file
+        """
+        header = self.header(k)
+        if header["height"] != header["width"]:
+            raise ValueError("maze %d is not square, use MazeFile.grid" % k)
+        return Maze.from_grid(header["width"], self.grid(k), header["seed"])
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def _find(self, k):
+        """
+        walk the record headers until the offset of record k is known (all records if k is None)
+        only the headers are read, the cells are skipped
+        :param k: int or None
+        :return: None
+        """
+        while (k is None or len(self.offsets) <= k) and self._end < len(self.map):
+            magic, version, _, _, height, width, _ = HEADER.unpack_from(self.map, self._end)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("not a maze record at byte %d" % self._end)
+            self.offsets.append(self._end)
+            self._end += HEADER.size + height * row_bytes(width)
+        if k is not None and len(self.offsets) <= k:
+            raise IndexError("maze index out of range")
+
+    def header(self, k):
+        """
+        :param k: int, index of the maze in the file
+        :return: dict, height, width, seed (None if unknown), algorithm (name) and offset of the record
+        """
+        if k < 0:
+            k += len(self)
+        self._find(k)
+        offset = self.offsets[k]
+        _, _, algorithm, flags, height, width, seed = HEADER.unpack_from(self.map, offset)
+        names = {code: name for name, code in ALGORITHMS.items()}
+        return {"height": height,
+                "width": width,
+                "seed": seed if flags & HAS_SEED else None,
+                "algorithm": names.get(algorithm, algorithm),
+                "offset": offset}
+
+    def grid(self, k):
+        """
+        :param k: int, index of the maze in the file
+        :return: BitGrid, cells of the maze, without copying them out of the file
+        """
+        header = self.header(k)
+        start = header["offset"] + HEADER.size
+        end = start + header["height"] * row_bytes(header["width"])
+        return BitGrid(self.view[start:end], header["height"], header["width"])
@@ -0,0 +1,96 @@
+"""
+placement.py
+This file contains the treasure placement engine.
+The cells where a treasure may go (rules 1 to 3) are found in one pass over the rows of the maze,
+then one treasure is drawn from the cells of each TREAS_DENSITY x TREAS_DENSITY region, skipping the cells too
+close to a treasure already placed (rule 4), which are marked on an occupancy mask of the grid.
+Placement never retries, so it takes the same bounded time on any maze, and a region without any valid cell
+simply gets no treasure.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+from constants import TREAS_DENSITY, TREAS_SPACING
+from maze import Maze
+
+# cell codes -> "0" / "1" digits of the bits of a row
+_CELL_TO_DIGIT = bytes.maketrans(bytes([Maze.PATH_CELL, Maze.WALL_CELL]), b"01")
+
+
+def treasure_candidates(maze):
+    """
+    find the cells satisfying the treasure position rules 1 to 3, in one pass over the rows of the maze
+    rules:
+    1. treasure cannot be in the same position as wall.
+    2. treasure must have walls on either top-bottom or left-right
+    3. treasure can't be near an entrance (a gap on a continuous wall)
+    every row is turned into an int with one bit per cell (1 for a wall, column 0 in the highest bit),
+    so the rules are checked on all the cells of a row at once with bitwise operations on its neighbour rows
+    :param maze: Maze class object
+    :return: list of int, indexes in maze.grid of the cells where a treasure may go, in increasing order
+    """
+    grid = maze.grid
+    size = maze.size
+    rows = [int(bytes(grid[i * size:(i + 1) * size]).translate(_CELL_TO_DIGIT), 2) for i in range(size)]
+    # columns 1 to size - 2, the frame is never a candidate
+    inner = ((1 << (size - 1)) - 1) & ~1
+    candidates = []
+    for i in range(1, size - 1):
+        up, row, down = rows[i - 1], rows[i], rows[i + 1]
+        # row >> 1 lines up the left neighbours of the cells, row << 1 the right ones
+        bits = (~row & ((up & down) | ((row >> 1) & (row << 1)))
+                & (up >> 1) & (up << 1) & (down >> 1) & (down << 1) & inner)
+        text = format(bits, "0%db" % size)
+        j = text.find("1")
+        while j != -1:
+            candidates.append(i * size + j)
+            j = text.find("1", j + 1)
+    return candidates
+
+
+def treasure_regions(size, density=TREAS_DENSITY):
+    """
+    split the maze into square regions of one treasure each, centered with the same padding on both sides
+    :param size: int, the length of the square maze map
+    :param density: int, length of a region
+    :return: int, int, padding before the first region and number of regions on a row
+    """
+    padding = max(0, size % density - 1)
+    return padding, (size - padding) // density
+
+
+def place_treasures(maze, rng, density=TREAS_DENSITY, spacing=TREAS_SPACING):
+    """
+    draw one treasure position per region among the cells satisfying all treasure position rules
+    4. there must be space between any 2 treasures: no 2 treasures within spacing cells, on both i and j
+    :param maze: Maze class object
+    :param rng: random.Random (or the random module)
+    :param density: int, length of a region
+    :param spacing: int, min number of cells between 2 treasures, on i or j
+    :return: list of [i, j] in maze.grid, regions in order, row by row
+    """
+    size = maze.size
+    padding, per_row = treasure_regions(size, density)
+    # candidate cells of every region
+    regions = [[] for _ in range(per_row * per_row)]
+    for k in treasure_candidates(maze):
+        i, j = divmod(k, size)
+        region_i = (i - padding) // density
+        region_j = (j - padding) // density
+        if 0 <= region_i < per_row and 0 <= region_j < per_row:
+            regions[region_i * per_row + region_j].append(k)
+    # cells too close to a treasure already placed
+    blocked = bytearray(size * size)
+    positions = []
+    for cells in regions:
+        available = [k for k in cells if not blocked[k]]
+        if not available:
+            continue
+        i, j = divmod(rng.choice(available), size)
+        positions.append([i, j])
+        first_j = max(0, j - spacing)
+        last_j = min(size, j + spacing + 1)
+        for row in range(max(0, i - spacing), min(size, i + spacing + 1)):
+            blocked[row * size + first_j:row * size + last_j] = b"\x01" * (last_j - first_j)
+    return positions
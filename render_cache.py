@@ -0,0 +1,77 @@
+"""
+render_cache.py
+This file contains RenderCache class, which keeps rotated, scaled and text surfaces so they are only built once
+instead of on every frame.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import pygame
+from collections import OrderedDict
+
+
+class RenderCache:
+
+    def __init__(self, text_capacity=64):
+        """
+        initialize an empty cache
+        :param text_capacity: int, max number of rendered texts kept, the least recently used one is dropped first
+        self.transformed: dict, (surface, transform, parameters) -> transformed surface
+        self.texts: OrderedDict, (font, text, antialias, colour) -> rendered text, oldest first
+        """
+        self.text_capacity = text_capacity
+        self.transformed = {}
+        self.texts = OrderedDict()
+
+    def rotated(self, surface, angle):
+        """
+        :param surface: pygame.Surface, asset to rotate
+        :param angle: int, degrees counter clockwise
+        :return: pygame.Surface, rotated asset
+        """
+        key = (surface, "rotate", angle)
+        if key not in self.transformed:
+            self.transformed[key] = pygame.transform.rotate(surface, angle)
+        return self.transformed[key]
+
+    def scaled(self, surface, size):
+        """
+        :param surface: pygame.Surface, asset to scale
+        :param size: (width, height), new size
+        :return: pygame.Surface, scaled asset
+        """
+        key = (surface, "scale", tuple(size))
+        if key not in self.transformed:
+            self.transformed[key] = pygame.transform.scale(surface, size)
+        return self.transformed[key]
+
+    def text(self, font, text, antialias, colour):
+        """
+        same as font.render(text, antialias, colour), but reuses the surface if the same text was rendered before
+        :param font: pygame.font.Font
+        :param text: str
+        :param antialias: Boolean
+        :param colour: (r, g, b)
+        :return: pygame.Surface, rendered text
+        """
+        key = (font, text, antialias, colour)
+        if key in self.texts:
+            self.texts.move_to_end(key)
+        else:
+            self.texts[key] = font.render(text, antialias, colour)
+            if len(self.texts) > self.text_capacity:
+                self.texts.popitem(last=False)
+        return self.texts[key]
+
+    def prewarm(self, rotations=(), scales=()):
+        """
+        build transformed surfaces ahead of time, so the first frames don't pay for them
+        :param rotations: list of (surface, angle)
+        :param scales: list of (surface, size)
+        :return: None
+        """
+        for surface, angle in rotations:
+            self.rotated(surface, angle)
+        for surface, size in scales:
+            self.scaled(surface, size)
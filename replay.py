@@ -0,0 +1,310 @@
+"""
+replay.py
+This file contains the input recorder and the replay engine.
+A round is fully given by the seed of its maze and the keys held down at every step, since GameState places the
+treasures from the maze seed and steps by fixed frames, so a recording is only that and plays back to the same round.
+
+A log is a 24 bytes header followed by the key runs:
+    header: magic b"MR", version (u8), flags (u8), maze size (u16), score (u16), seed (u64), frames (u32),
+            rules (u32), little endian
+    runs:   for every run of frames with the same keys, the keys as a mask (u8, bit 0 up, 1 down, 2 left, 3 right,
+            4 start) and the number of frames as a LEB128 varint
+Keys change a few times a second at most, so a 3 minutes round takes a few hundred bytes.
+The rules are a fingerprint of the constants that decide how a round plays out (frame rate, length of the round,
+speed, treasures, trapping walls), a log recorded under other rules is refused instead of replayed to a wrong score.
+
+usage: python replay.py round.rec | --game ID [--export round.rec] | --audit 10 [--database scores.db]
+                        [--render] [--speed 4]
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import argparse
+import sqlite3
+import struct
+import time
+import zlib
+from database import DATABASE
+from game_state import (GameState, Inputs, FPS, ROUND_STEPS, BLOCK_SIZE, CHARACTER_PADDING, SPEED, TREAS_DENSITY,
+                        TREAS_SPACING, MAX_TOUR, LAYOUT_ATTEMPTS, TRAP_WALL_MOTION, CLOSE_INDEX)
+from maze import Maze
+
+MAGIC = b"MR"
+VERSION = 1
+HEADER = struct.Struct("<2sBBHHQII")
+# fingerprint of the game rules a log plays back under
+RULES = zlib.crc32(repr((FPS, ROUND_STEPS, BLOCK_SIZE, CHARACTER_PADDING, SPEED, TREAS_DENSITY, TREAS_SPACING,
+                         MAX_TOUR, LAYOUT_ATTEMPTS, TRAP_WALL_MOTION, CLOSE_INDEX)).encode())
+# flags
+FINISHED = 1  # the round was played to the end, the score is the final score
+
+
+def inputs_mask(inputs):
+    """
+    :param inputs: Inputs
+    :return: int, 5 bits mask of the keys held down
+    """
+    mask = 0
+    for bit, held in enumerate(inputs):
+        if held:
+            mask |= 1 << bit
+    return mask
+
+
+def mask_inputs(mask):
+    """
+    :param mask: int, 5 bits mask of the keys held down
+    :return: Inputs
+    """
+    return Inputs(*(bool(mask >> bit & 1) for bit in range(len(Inputs._fields))))
+
+
+def write_varint(out, value):
+    """
+    :param out: bytearray, appended to
+    :param value: int, not negative
+    :return: None
+    """
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, offset):
+    """
+    :param data: bytes-like
+    :param offset: int, position of the varint
+    :return: int, int: value and position after it
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class InputRecorder:
+
+    def __init__(self, maze):
+        """
+        start recording a round
+        :param maze: Maze class object, must have a seed
+        self.runs: list of [mask, frames], keys held down, one entry per run of frames with the same keys
+        """
+        if maze.seed is None:
+            raise ValueError("only a maze with a seed can be replayed")
+        self.seed = maze.seed
+        self.maze_size = maze.size
+        self.runs = []
+        self.frames = 0
+
+    def record(self, inputs):
+        """
+        record the keys of one step, in the order given to GameState.step
+        :param inputs: Inputs
+        :return: None
+        """
+        mask = inputs_mask(inputs)
+        if self.runs and self.runs[-1][0] == mask:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([mask, 1])
+        self.frames += 1
+
+    def to_bytes(self, score=0, finished=True):
+        """
+        :param score: int, score of the round, checked by the replay
+        :param finished: bool, True if the round was played to the end
+        :return: bytes, the log
+        """
+        out = bytearray(HEADER.pack(MAGIC, VERSION, FINISHED if finished else 0, self.maze_size, score,
+                                    self.seed, self.frames, RULES))
+        for mask, frames in self.runs:
+            out.append(mask)
+            write_varint(out, frames)
+        return bytes(out)
+
+    def save(self, path, score=0, finished=True):
+        """
+        :param path: str, path of the log file
+        :param score: int, score of the round
+        :param finished: bool, True if the round was played to the end
+        :return: None
+        """
+        with open(path, "wb") as file:
+            file.write(self.to_bytes(score, finished))
+
+
+class InputLog:
+
+    def __init__(self, data):
+        """
+        read a log
+        :param data: bytes-like, the log
+        self.runs: list of (mask, frames), keys held down, one entry per run of frames with the same keys
+        """
+        self.data = bytes(data)
+        if len(data) < HEADER.size:
+            raise ValueError("not an input log")
+        magic, version, flags, self.maze_size, self.score, self.seed, self.frames, rules = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not an input log")
+        if version != VERSION:
+            raise ValueError(f"input log version {version} is not supported")
+        if rules != RULES:
+            raise ValueError("input log was recorded under other game rules (constants.py changed), "
+                             "it can't be played back")
+        self.finished = bool(flags & FINISHED)
+        self.runs = []
+        offset = HEADER.size
+        try:
+            while offset < len(data):
+                mask = data[offset]
+                frames, offset = read_varint(data, offset + 1)
+                self.runs.append((mask, frames))
+        except IndexError:
+            raise ValueError("input log is truncated")
+        if sum(frames for _, frames in self.runs) != self.frames:
+            raise ValueError("input log is truncated")
+
+    @classmethod
+    def load(cls, path):
+        """
+        :param path: str, path of the log file
+        :return: InputLog
+        """
+        with open(path, "rb") as file:
+            return cls(file.read())
+
+    def maze(self):
+        """
+        :return: Maze class object, the maze of the round
+        """
+        return Maze(self.maze_size, self.seed)
+
+    def inputs(self):
+        """
+        :return: generator of Inputs, the keys of every step
+        """
+        for mask, frames in self.runs:
+            inputs = mask_inputs(mask)
+            for _ in range(frames):
+                yield inputs
+
+
+def replay(log):
+    """
+    play a log back headless, as fast as possible
+    :param log: InputLog
+    :return: GameState, the round after the last step
+    """
+    state = GameState(log.maze())
+    step = state.step
+    for mask, frames in log.runs:
+        inputs = mask_inputs(mask)
+        for _ in range(frames):
+            step(inputs)
+    return state
+
+
+def verify(log):
+    """
+    play a log back and check it gives the score it claims
+    :param log: InputLog
+    :return: (bool, GameState): True if the score (and the end of the round, if it was finished) match
+    """
+    state = replay(log)
+    return state.score == log.score and (not log.finished or state.game_over), state
+
+
+def load_game(game_id, database=DATABASE):
+    """
+    :param game_id: int, id of a game in the database
+    :param database: str, path of the database file
+    :return: InputLog, None if the game has no log
+    """
+    conn = sqlite3.connect(database)
+    row = conn.execute("SELECT replay FROM games WHERE id = ?", (game_id,)).fetchone()
+    conn.close()
+    return InputLog(row[0]) if row and row[0] is not None else None
+
+
+def audit(count, database=DATABASE):
+    """
+    play back the logs of the best games and check their scores
+    :param count: int, number of games, best score first
+    :param database: str, path of the database file
+    :return: list of (id, stored score, replayed score, ok, error), replayed score is None and error says why
+             if the log can't be played back (recorded under other rules), error is None otherwise
+    """
+    conn = sqlite3.connect(database)
+    rows = conn.execute("SELECT id, score, replay FROM games INDEXED BY games_score WHERE replay IS NOT NULL "
+                        "ORDER BY score DESC, played_at LIMIT ?", (count,)).fetchall()
+    conn.close()
+    results = []
+    for game_id, score, data in rows:
+        try:
+            log = InputLog(data)
+        except ValueError as error:
+            results.append((game_id, score, None, False, str(error)))
+            continue
+        ok, state = verify(log)
+        results.append((game_id, score, state.score, ok and state.score == score, None))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="play back recorded rounds")
+    parser.add_argument("log", nargs="?", default=None, help="input log file to play back")
+    parser.add_argument("--game", type=int, default=None, help="play back the log of this game of the database")
+    parser.add_argument("--export", default=None, help="save the log of --game to this file")
+    parser.add_argument("--audit", type=int, default=None, help="check the logs of the N best games of the database")
+    parser.add_argument("--database", default=DATABASE, help="score database")
+    parser.add_argument("--render", action="store_true", help="show the round instead of playing it headless")
+    parser.add_argument("--speed", type=float, default=1, help="speed of the rendered play back")
+    args = parser.parse_args()
+
+    if args.audit is not None:
+        results = audit(args.audit, args.database)
+        for game_id, score, replayed, ok, error in results:
+            if error is not None:
+                print(f"game {game_id}: score {score}, not checked: {error}")
+            else:
+                print(f"game {game_id}: score {score}, replayed {replayed}{'' if ok else '  MISMATCH'}")
+        checked = [ok for _, _, _, ok, error in results if error is None]
+        print(f"{sum(not ok for ok in checked)} of {len(checked)} games don't match their log"
+              f"{f', {len(results) - len(checked)} logs not checked' if len(checked) < len(results) else ''}")
+        return
+    if args.log is None and args.game is None:
+        parser.error("give an input log, --game or --audit")
+    try:
+        log = load_game(args.game, args.database) if args.game is not None else InputLog.load(args.log)
+    except ValueError as error:
+        parser.error(str(error))
+    if log is None:
+        parser.error("the game has no input log")
+    if args.export:
+        with open(args.export, "wb") as file:
+            file.write(log.data)
+    if args.render:
+        # the display is only opened when a round is shown
+        import main as game
+        game.watch_replay(log, args.speed)
+        return
+    start = time.perf_counter()
+    ok, state = verify(log)
+    elapsed = time.perf_counter() - start
+    print(f"seed {log.seed}, {log.frames} frames in {len(log.runs)} runs: score {state.score}/{state.num_treasures} "
+          f"(log says {log.score}), {'killed' if state.player_killed else 'alive'}")
+    print(f"replayed in {elapsed * 1000:.1f} ms, {log.frames / FPS / max(elapsed, 1e-9):.0f}x real time, "
+          f"{'ok' if ok else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+score_service.py
+This file contains ScoreService class, which saves scores on a background thread so the game loop never waits for
+the disk. It keeps one connection to the score database open (in WAL mode), takes the scores through a queue,
+writes the ones waiting together in one transaction, and hands the all time high, the average and the percentile
+rank of the score back through a future.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from database import DATABASE, insert_game, migrate, percentile_rank, read_stats
+
+# max number of scores written in one transaction
+BATCH_SIZE = 256
+
+
+class ScoreService:
+
+    def __init__(self, database=DATABASE, batch_size=BATCH_SIZE):
+        """
+        start the writer thread, it opens the database and applies its migrations
+        :param database: str, path of the database file
+        :param batch_size: int, max number of scores written in one transaction
+        self.submissions: queue.Queue, (game, Future), game is (score, maze_size, num_treasures, replay) or None to only
+            read the stats, None asks the writer to stop
+        self.ready: Future, done once the database is open, holds the error if it can't be
+        self.batches: int, number of transactions written
+        """
+        self.database = database
+        self.batch_size = batch_size
+        self.submissions = queue.Queue()
+        self.ready = Future()
+        self.batches = 0
+        self.closed = False
+        # daemon: a game quitting without close() isn't held up, the scores still queued are lost
+        self.thread = threading.Thread(target=self.run, name="score-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, score, maze_size=0, num_treasures=0, replay=None):
+        """
+        queue a score to be saved, returns right away
+        :param score: int, score of the round
+        :param maze_size: int, size of the maze, 0 if unknown
+        :param num_treasures: int, number of treasures of the round, 0 if unknown
+        :param replay: bytes, input log of the round (InputRecorder.to_bytes), None if it wasn't recorded
+        :return: Future, its result is (highest_score, average, rank) once the score is saved, the score included,
+                 rank: share of the games on the same maze parameters with a lower score, see percentile_rank
+        """
+        return self.put((score, maze_size, num_treasures, replay))
+
+    def stats(self):
+        """
+        all time high and average, read on the writer thread after the scores submitted before
+        :return: Future, its result is (highest_score, average, -1), -1, -1, -1 if no game has been played yet
+        """
+        return self.put(None)
+
+    def put(self, game):
+        """
+        :param game: (score, maze_size, num_treasures, replay), None to only read the stats
+        :return: Future
+        """
+        if self.closed:
+            raise RuntimeError("score service is closed")
+        future = Future()
+        self.submissions.put((game, future))
+        return future
+
+    def close(self, timeout=None):
+        """
+        save the scores still queued and stop the writer thread
+        :param timeout: float, max number of seconds to wait for the writer, no limit if None
+        :return: None
+        """
+        if not self.closed:
+            self.closed = True
+            self.submissions.put(None)
+        self.thread.join(timeout)
+
+    def run(self):
+        """
+        writer thread: wait for a score, take every other score already waiting (up to batch_size) and write them
+        in one transaction, until close()
+        :return: None
+        """
+        conn = None
+        try:
+            conn = sqlite3.connect(self.database)
+            # readers (score_stats, analytics) don't block the writer, and a commit doesn't wait for a full sync
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            migrate(conn)
+        except Exception as error:
+            # any failure, not only sqlite3.Error, must reach the futures or they would wait forever
+            if conn is not None:
+                conn.close()
+            self.ready.set_exception(error)
+            self.fail_pending(error)
+            return
+        self.ready.set_result(True)
+        running = True
+        while running:
+            batch = [self.submissions.get()]
+            while batch[-1] is not None and len(batch) < self.batch_size:
+                try:
+                    batch.append(self.submissions.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                batch.pop()
+                running = False
+            if batch:
+                self.write(conn, batch)
+        conn.close()
+
+    def write(self, conn, batch):
+        """
+        write a batch of scores in one transaction, then resolve their futures
+        :param conn: sqlite3.Connection
+        :param batch: list of (game, Future), a game of None only reads the stats
+        :return: None
+        """
+        cur = conn.cursor()
+        results = []
+        try:
+            for game, future in batch:
+                rank = -1
+                if game is not None:
+                    score, maze_size, num_treasures, replay = game
+                    insert_game(cur, score, maze_size, num_treasures, replay=replay)
+                    rank = percentile_rank(cur, score, maze_size, num_treasures)
+                results.append(read_stats(cur) + (rank,))
+            conn.commit()
+        except Exception as error:
+            # a bad value fails its batch only, the writer keeps running for the next ones
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        self.batches += 1
+        # only once the scores are on disk
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def fail_pending(self, error):
+        """
+        fail every submission, the database couldn't be opened
+        :param error: Exception
+        :return: None
+        """
+        while True:
+            submission = self.submissions.get()
+            if submission is None:
+                return
+            submission[1].set_exception(error)
@@ -0,0 +1,160 @@
+"""
+simulate.py
+This file runs rounds of the game without a display, with bots instead of a player,
+across a pool of processes, much faster than real time.
+It is used for balance testing and for load testing the score database.
+
+usage: python simulate.py --games 1000 --workers 8 --bot random [--database scores.db]
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from constants import MAZE_SIZE, FPS
+from score_service import ScoreService
+from game_state import GameState, Inputs, PLAYER_START_CELL
+from maze import Maze
+from solver import tour_bounds
+
+
+def idle_bot(rng, script=None):
+    """
+    start the round and stand still
+    :param rng: random.Random
+    :param script: not used
+    :return: function, GameState -> Inputs
+    """
+    def bot(state):
+        return Inputs(False, False, False, False, True)
+    return bot
+
+
+def random_walk_bot(rng, script=None):
+    """
+    keep walking in one direction, turn to a random one when running into a wall, or about once a second
+    :param rng: random.Random
+    :param script: not used
+    :return: function, GameState -> Inputs
+    """
+    direction = [rng.randrange(4)]
+
+    def bot(state):
+        if state.player_standing_still or rng.random() < 1 / FPS:
+            direction[0] = rng.randrange(4)
+        keys = [False, False, False, False]
+        keys[direction[0]] = True
+        return Inputs(keys[0], keys[1], keys[2], keys[3], True)
+    return bot
+
+
+def script_bot(rng, script=None):
+    """
+    play back a list of inputs, one per step, then stand still
+    :param rng: not used
+    :param script: list of Inputs
+    :return: function, GameState -> Inputs
+    """
+    steps = iter(script or [])
+
+    def bot(state):
+        return next(steps, Inputs(False, False, False, False, True))
+    return bot
+
+
+BOTS = {"idle": idle_bot, "random": random_walk_bot, "script": script_bot}
+
+
+def run_game(seed, bot="random", script=None):
+    """
+    play one round headless
+    :param seed: int, seed of the maze, the treasures and the bot
+    :param bot: str, name of the bot in BOTS
+    :param script: list of Inputs, for the script bot
+    :return: dict, result of the round
+    """
+    maze = Maze(MAZE_SIZE, seed)
+    state = GameState(maze)
+    # how hard the layout is: steps needed to collect all the treasures
+    bounds = tour_bounds(maze, PLAYER_START_CELL, state.treasure_positions)
+    player = BOTS[bot](random.Random(seed), script)
+    steps = 0
+    while not state.game_over:
+        state.step(player(state))
+        steps += 1
+    return {"seed": seed,
+            "score": state.score,
+            "num_treasures": state.num_treasures,
+            "killed": state.player_killed,
+            "steps": steps,
+            "time_left": state.time_left,
+            "reachable": bounds["reachable"],
+            "tour_lower": bounds["lower"],
+            "tour_upper": bounds["upper"]}
+
+
+def run_games(games, workers=None, bot="random", seed=0, script=None):
+    """
+    play many rounds across a process pool
+    :param games: int, number of rounds
+    :param workers: int, number of processes, the number of CPUs if None
+    :param bot: str, name of the bot in BOTS
+    :param seed: int, seed of the first round, round k uses seed + k
+    :param script: list of Inputs, for the script bot
+    :return: generator of dict, results in order of the seeds
+    """
+    seeds = range(seed, seed + games)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, games // ((workers or 1) * 16))
+        yield from executor.map(run_game, seeds, [bot] * games, [script] * games, chunksize=chunksize)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run headless rounds of the game with bots")
+    parser.add_argument("--games", type=int, default=1000, help="number of rounds")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: CPUs)")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="random", help="who plays the rounds")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first round")
+    parser.add_argument("--database", default=None, help="submit every score to this score database")
+    args = parser.parse_args()
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    score_service = ScoreService(args.database) if args.database else None
+    start = time.perf_counter()
+    results = []
+    for result in run_games(args.games, args.workers, args.bot, args.seed):
+        results.append(result)
+        if score_service:
+            score_service.submit(result["score"], MAZE_SIZE, result["num_treasures"])
+    elapsed = time.perf_counter() - start
+    if score_service:
+        # time to save the scores still queued once the rounds are over
+        flush_start = time.perf_counter()
+        score_service.close()
+        flush_time = time.perf_counter() - flush_start
+
+    scores = [result["score"] for result in results]
+    simulated = sum(result["steps"] for result in results) / FPS
+    print(f"{len(results)} games in {elapsed:.2f}s: {len(results) / elapsed:.1f} games/s, "
+          f"{simulated / elapsed:.0f}x real time")
+    print(f"score: mean {sum(scores) / len(scores):.2f}, max {max(scores)}/{results[0]['num_treasures']}, "
+          f"killed {sum(result['killed'] for result in results) / len(results):.1%}")
+    tours = [result["tour_upper"] for result in results if result["reachable"]]
+    if tours:
+        print(f"layouts: {len(results) - len(tours)} unwinnable, tour over all treasures "
+              f"{min(tours)}-{max(tours)} steps (mean {sum(tours) / len(tours):.0f})")
+    else:
+        print("layouts: all layouts unwinnable")
+    if score_service:
+        print(f"database: {len(results)} scores in {score_service.batches} transactions, "
+              f"{flush_time * 1000:.1f} ms to flush after the last round")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+solver.py
+This file contains the maze solver: breadth first search distance fields, A* path queries and estimates of the
+shortest tour over a set of cells, for checking a layout is winnable and how long it takes before a round starts.
+It works on the flat Maze.grid, cell (i, j) is at i * size + j, and moves between path cells sharing a side.
+Cells are given as (i, j) in maze.grid, the same as the treasure positions of GameState.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import heapq
+from maze import Maze
+
+# distance of the cells no source reaches, and of the walls
+UNREACHABLE = -1
+WALL = -2
+
+
+def distance_field(maze, sources):
+    """
+    multi-source breadth first search: distance from every cell to the nearest source
+    :param maze: Maze class object
+    :param sources: list of (i, j), path cells the distances are measured from
+    :return: list, one entry per cell of maze.grid, number of steps to the nearest source,
+             UNREACHABLE for the cells no source reaches and WALL for walls
+    """
+    size = maze.size
+    # wall cells are the only non-zero cell codes, so paths start at UNREACHABLE and walls at WALL
+    distances = [UNREACHABLE - code for code in maze.grid]
+    frontier = []
+    for i, j in sources:
+        k = i * size + j
+        if distances[k] == UNREACHABLE:
+            distances[k] = 0
+            frontier.append(k)
+    # expand the cells one step further at a time
+    # the frame of the maze is all walls, so the neighbours of a path cell are always in the grid
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for k in frontier:
+            for n in (k - size, k + size, k - 1, k + 1):
+                if distances[n] == UNREACHABLE:
+                    distances[n] = distance
+                    next_frontier.append(n)
+        frontier = next_frontier
+    return distances
+
+
+def distances_from(maze, source):
+    """
+    single-source breadth first search
+    :param maze: Maze class object
+    :param source: (i, j), path cell
+    :return: list, distance field of the source, see distance_field
+    """
+    return distance_field(maze, [source])
+
+
+def distance_at(maze, distances, cell):
+    """
+    :param maze: Maze class object
+    :param distances: list, a distance field of the maze
+    :param cell: (i, j)
+    :return: int, distance of the cell in the field, negative if it is not reached (UNREACHABLE or WALL)
+    """
+    return distances[cell[0] * maze.size + cell[1]]
+
+
+def reachable(maze, start, targets):
+    """
+    :param maze: Maze class object
+    :param start: (i, j), path cell
+    :param targets: list of (i, j)
+    :return: True if every target can be reached from start
+    """
+    distances = distances_from(maze, start)
+    return all(distance_at(maze, distances, target) >= 0 for target in targets)
+
+
+def find_path(maze, start, goal):
+    """
+    A* shortest path, the manhattan distance never overestimates the steps left on a grid
+    :param maze: Maze class object
+    :param start: (i, j), path cell
+    :param goal: (i, j), path cell
+    :return: list of (i, j) from start to goal, both included, None if goal can't be reached
+    """
+    grid = maze.grid
+    size = maze.size
+    goal_i, goal_j = goal
+    start_k = start[0] * size + start[1]
+    goal_k = goal_i * size + goal_j
+    if grid[start_k] != Maze.PATH_CELL or grid[goal_k] != Maze.PATH_CELL:
+        return None
+    came_from = {start_k: None}
+    cost = {start_k: 0}
+    # (estimate, cost, cell), ties go to the cell closest to the goal
+    heap = [(abs(start[0] - goal_i) + abs(start[1] - goal_j), 0, start_k)]
+    while heap:
+        _, steps, k = heapq.heappop(heap)
+        if k == goal_k:
+            path = []
+            while k is not None:
+                path.append(divmod(k, size))
+                k = came_from[k]
+            return path[::-1]
+        if steps > cost[k]:
+            continue
+        for n in (k - size, k + size, k - 1, k + 1):
+            if grid[n] == Maze.PATH_CELL and (n not in cost or steps + 1 < cost[n]):
+                cost[n] = steps + 1
+                came_from[n] = k
+                i, j = divmod(n, size)
+                heapq.heappush(heap, (steps + 1 + abs(i - goal_i) + abs(j - goal_j), steps + 1, n))
+    return None
+
+
+def path_length(maze, start, goal):
+    """
+    :param maze: Maze class object
+    :param start: (i, j), path cell
+    :param goal: (i, j), path cell
+    :return: int, number of steps of the shortest path, UNREACHABLE if goal can't be reached
+    """
+    path = find_path(maze, start, goal)
+    return len(path) - 1 if path is not None else UNREACHABLE
+
+
+def distance_matrix(maze, cells):
+    """
+    shortest path distances between all pairs of cells, one breadth first search per cell
+    :param maze: Maze class object
+    :param cells: list of (i, j), path cells
+    :return: list of list of int, matrix[a][b] is the distance from cells[a] to cells[b], negative if none
+    """
+    matrix = []
+    for cell in cells:
+        distances = distances_from(maze, cell)
+        matrix.append([distance_at(maze, distances, other) for other in cells])
+    return matrix
+
+
+def nearest_neighbour_tour(matrix):
+    """
+    tour starting at cell 0, always going to the closest cell not visited yet
+    :param matrix: list of list of int, distance_matrix of the cells, all reachable
+    :return: int, list of int: length of the tour, and order the cells are visited in
+    """
+    order = [0]
+    left = set(range(1, len(matrix)))
+    length = 0
+    while left:
+        row = matrix[order[-1]]
+        closest = min(left, key=lambda b: (row[b], b))
+        length += row[closest]
+        order.append(closest)
+        left.remove(closest)
+    return length, order
+
+
+def improve_tour(matrix, order):
+    """
+    2-opt: reverse parts of an open tour (starting at order[0]) while it makes the tour shorter
+    :param matrix: list of list of int, distance_matrix of the cells, all reachable
+    :param order: list of int, order the cells are visited in
+    :return: int, list of int: length of the improved tour, and its order
+    """
+    order = list(order)
+    improved = True
+    while improved:
+        improved = False
+        for a in range(1, len(order) - 1):
+            for b in range(a + 1, len(order)):
+                # replace the edges (a - 1, a) and (b, b + 1) by (a - 1, b) and (a, b + 1)
+                before = matrix[order[a - 1]][order[a]]
+                after = matrix[order[a - 1]][order[b]]
+                if b + 1 < len(order):
+                    before += matrix[order[b]][order[b + 1]]
+                    after += matrix[order[a]][order[b + 1]]
+                if after < before:
+                    order[a:b + 1] = order[a:b + 1][::-1]
+                    improved = True
+    length = sum(matrix[order[k]][order[k + 1]] for k in range(len(order) - 1))
+    return length, order
+
+
+def spanning_tree_length(matrix):
+    """
+    length of the minimum spanning tree of the cells (Prim), no tour visiting all of them is shorter
+    :param matrix: list of list of int, distance_matrix of the cells, all reachable
+    :return: int
+    """
+    if not matrix:
+        return 0
+    best = list(matrix[0])
+    left = set(range(1, len(matrix)))
+    length = 0
+    while left:
+        closest = min(left, key=lambda b: best[b])
+        length += best[closest]
+        left.remove(closest)
+        for b in left:
+            best[b] = min(best[b], matrix[closest][b])
+    return length
+
+
+def tour_bounds(maze, start, targets):
+    """
+    estimate the length of the shortest walk from start through all targets
+    :param maze: Maze class object
+    :param start: (i, j), path cell
+    :param targets: list of (i, j), path cells
+    :return: dict, "reachable": True if every target can be reached,
+                   "distances": list of int, distance from start to each target,
+                   "lower": int, minimum spanning tree length, the shortest tour is at least that long,
+                   "upper": int, length of a nearest neighbour tour improved by 2-opt, a tour that long exists,
+                   "order": list of int, indexes of the targets in the order of that tour
+             lower, upper and order are None if a target can't be reached
+    """
+    matrix = distance_matrix(maze, [tuple(start)] + [tuple(target) for target in targets])
+    distances = matrix[0][1:]
+    result = {"reachable": min(distances, default=0) >= 0, "distances": distances,
+              "lower": None, "upper": None, "order": None}
+    if result["reachable"]:
+        length, order = improve_tour(matrix, nearest_neighbour_tour(matrix)[1])
+        result["lower"] = spanning_tree_length(matrix)
+        result["upper"] = length
+        result["order"] = [k - 1 for k in order[1:]]
+    return result
+
+
+def layout_ok(maze, start, targets, max_length=None):
+    """
+    check a layout before a round starts
+    :param maze: Maze class object
+    :param start: (i, j), path cell
+    :param targets: list of (i, j), path cells
+    :param max_length: int, max number of steps to collect all targets, no limit if None
+    :return: True if every target can be reached, and (with max_length) the tour found over all of them takes at most
+             max_length steps; that tour is an upper bound, so a layout that passes is never too long
+    """
+    bounds = tour_bounds(maze, start, targets)
+    if not bounds["reachable"]:
+        return False
+    return max_length is None or bounds["upper"] <= max_length
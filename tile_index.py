@@ -0,0 +1,76 @@
+"""
+tile_index.py
+This file contains TileIndex class, a lookup of what occupies each tile of the maze.
+The world is a regular grid of BLOCK_SIZE tiles, so the tiles overlapping a rect can be found by division,
+and only the items registered on those tiles need to be checked for collision.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+
+class TileIndex:
+
+    def __init__(self, origin, block_size):
+        """
+        initialize an empty index
+        :param origin: int, world position of the top left corner of tile (0, 0), on both x and y
+        :param block_size: int, width and height of a tile
+        self.cells: dict, (i, j) -> list of items registered on tile (i, j)
+        """
+        self.origin = origin
+        self.block_size = block_size
+        self.cells = {}
+
+    def cells_overlapping(self, rect):
+        """
+        find the tiles a rect in world space overlaps
+        :param rect: pygame.Rect (or any object with x, y, width and height), position in world space
+        :return: list of (i, j), i along x and j along y
+        """
+        if rect.width <= 0 or rect.height <= 0:
+            return []
+        first_i = (rect.x - self.origin) // self.block_size
+        last_i = (rect.x + rect.width - 1 - self.origin) // self.block_size
+        first_j = (rect.y - self.origin) // self.block_size
+        last_j = (rect.y + rect.height - 1 - self.origin) // self.block_size
+        return [(i, j) for i in range(first_i, last_i + 1) for j in range(first_j, last_j + 1)]
+
+    def add(self, item, rect):
+        """
+        register an item on every tile rect overlaps
+        :param item: anything, returned by query
+        :param rect: area in world space the item can occupy
+        :return: None
+        """
+        for cell in self.cells_overlapping(rect):
+            self.cells.setdefault(cell, []).append(item)
+
+    def occupied(self, i, j):
+        """
+        :param i: int, tile index along x
+        :param j: int, tile index along y
+        :return: True if any item is registered on tile (i, j)
+        """
+        return (i, j) in self.cells
+
+    def query(self, rect):
+        """
+        find the items registered on the tiles a rect overlaps, each item only once
+        the items still need an exact collision check, they are only the candidates
+        :param rect: pygame.Rect (or any object with x, y, width and height), position in world space
+        :return: list of items
+        """
+        found = []
+        for cell in self.cells_overlapping(rect):
+            for item in self.cells.get(cell, ()):
+                if item not in found:
+                    found.append(item)
+        return found
+
+    def clear(self):
+        """
+        remove all items
+        :return: None
+        """
+        self.cells.clear()
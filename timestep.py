@@ -0,0 +1,95 @@
+"""
+timestep.py
+This file contains the fixed-timestep clock of the game loop, and the view of a round between two steps.
+The round always advances by steps of 1 / FPS second of game time, as many as the monotonic clock says are due,
+whatever the render rate is, so the game plays at the same speed on any machine. The frame drawn in between shows
+the player and the trapping walls interpolated between their positions before and after the last step.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import time
+from constants import FPS, MAX_FRAME_STEPS
+from game_state import Rect
+
+
+class FixedTimestep:
+
+    def __init__(self, step_time=1 / FPS, max_steps=MAX_FRAME_STEPS, clock=time.monotonic):
+        """
+        :param step_time: float, game time of a step, in seconds
+        :param max_steps: int, max number of steps run for one frame, the time beyond is dropped so a long stall
+                          (window dragged, machine asleep) doesn't fast forward the round
+        :param clock: function, monotonic time in seconds
+        self.accumulator: float, time due but not simulated yet, less than step_time after advance()
+        """
+        self.step_time = step_time
+        self.max_steps = max_steps
+        self.clock = clock
+        self.accumulator = 0.0
+        self.last = None
+
+    def advance(self):
+        """
+        take the time passed since the last call
+        :return: int, number of steps to run now
+        """
+        now = self.clock()
+        if self.last is not None:
+            self.accumulator += now - self.last
+        self.last = now
+        steps = int(self.accumulator / self.step_time)
+        self.accumulator -= steps * self.step_time
+        if steps > self.max_steps:
+            steps = self.max_steps
+            self.accumulator = 0.0
+        return steps
+
+    @property
+    def alpha(self):
+        """
+        :return: float, between 0 and 1, how far the frame is between the last step and the next one
+        """
+        return min(1.0, self.accumulator / self.step_time)
+
+
+def snapshot(state):
+    """
+    :param state: GameState
+    :return: positions of the moving things, to interpolate from once the state steps
+    """
+    return (state.player.x, state.player.y), [(trap_wall.x, trap_wall.y) for trap_wall in state.trap_wall_list]
+
+
+def lerp_rect(rect, position, alpha):
+    """
+    :param rect: Rect, where a thing is now
+    :param position: (x, y), where it was
+    :param alpha: float, between 0 and 1
+    :return: Rect, between the two positions, at position for 0 and at rect for 1
+    """
+    return Rect(round(position[0] + (rect.x - position[0]) * alpha),
+                round(position[1] + (rect.y - position[1]) * alpha), rect.width, rect.height)
+
+
+class InterpolatedState:
+    """
+    a round as drawn between two steps, read only: player and trap_wall_list are interpolated,
+    everything else is the state's
+    """
+
+    def __init__(self, state, previous, alpha):
+        """
+        :param state: GameState, after the last step
+        :param previous: snapshot of the state before the last step
+        :param alpha: float, between 0 and 1, see FixedTimestep.alpha
+        """
+        self.state = state
+        player, trap_walls = previous
+        self.player = lerp_rect(state.player, player, alpha)
+        self.trap_wall_list = [lerp_rect(trap_wall, position, alpha)
+                               for trap_wall, position in zip(state.trap_wall_list, trap_walls)]
+
+    def __getattr__(self, name):
+        return getattr(self.state, name)
@@ -0,0 +1,194 @@
+"""
+world.py
+This file contains ChunkedWorld class, an endless maze made of chunks generated on demand, and ExploreState class,
+the GameState of the exploration mode played in it.
+Every chunk is a Maze generated from a seed derived from the world seed and the chunk coordinates, so a chunk
+comes back the same after it was evicted, and the chunks around the camera are the only ones kept in memory.
+
+Chunk (ci, cj) covers the world cells i in [ci * CHUNK_SIZE, (ci + 1) * CHUNK_SIZE) along x, and the same
+along y with cj. CHUNK_SIZE is even, so the walls on even cells line up across chunks. A chunk owns the walls on its
+top and left border, and opens them at odd offsets: the cells next to them on both sides are always paths,
+so every chunk is reached from its neighbours.
+
+Author: Allyn Bao
+Date last modified: 10/17/2026
+"""
+
+import random
+from collections import OrderedDict
+from constants import BLOCK_SIZE, MAZE_ORIGIN, CHUNK_SIZE, CHUNK_OPENINGS, CHUNK_CACHE_BYTES
+from game_state import GameState, Rect
+from maze import Maze
+from tile_index import TileIndex
+
+
+class ChunkedWorld:
+
+    def __init__(self, seed=None, chunk_size=CHUNK_SIZE, max_bytes=CHUNK_CACHE_BYTES):
+        """
+        initialize an empty world, no chunk is generated until it is needed
+        :param seed: int, the same seed always gives the same world, a random one is picked if None
+        :param chunk_size: int, number of cells on a side of a chunk, even, CHUNK_SIZE + 1 must be a valid Maze size
+        :param max_bytes: int, memory cap of the cells of the chunks kept, the least recently used chunk goes first,
+                          it should hold at least the chunks on screen and the ones prefetched around them
+        self.chunks: OrderedDict, (ci, cj) -> bytearray of the chunk cells, least recently used first
+        """
+        if chunk_size % 2 != 0:
+            raise ValueError("chunk size must be even")
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.chunk_size = chunk_size
+        self.max_chunks = max(1, max_bytes // (chunk_size * chunk_size))
+        self.chunks = OrderedDict()
+        self.generated = 0
+        self.evicted = 0
+
+    def chunk_seed(self, ci, cj):
+        """
+        :param ci: int, chunk index along x
+        :param cj: int, chunk index along y
+        :return: int, seed of the chunk, the same in every process and every run
+        """
+        return random.Random(f"{self.seed}:{ci}:{cj}").getrandbits(64)
+
+    def generate_chunk(self, ci, cj):
+        """
+        generate the cells of a chunk, the frame of the Maze beyond the chunk belongs to its right and bottom
+        neighbours and is left out
+        :param ci: int, chunk index along x
+        :param cj: int, chunk index along y
+        :return: bytearray, cell (i, j) of the chunk is at i * chunk_size + j
+        """
+        size = self.chunk_size
+        maze = Maze(size + 1, self.chunk_seed(ci, cj))
+        cells = bytearray(size * size)
+        for i in range(size):
+            cells[i * size:(i + 1) * size] = maze.grid[i * (size + 1):i * (size + 1) + size]
+        # openings on the top and left borders
+        for j in maze.random.sample(range(1, size, 2), CHUNK_OPENINGS):
+            cells[j] = Maze.PATH_CELL
+        for i in maze.random.sample(range(1, size, 2), CHUNK_OPENINGS):
+            cells[i * size] = Maze.PATH_CELL
+        return cells
+
+    def chunk(self, ci, cj):
+        """
+        :param ci: int, chunk index along x
+        :param cj: int, chunk index along y
+        :return: bytearray, cells of the chunk, generated if it is not in memory
+        """
+        key = (ci, cj)
+        if key in self.chunks:
+            self.chunks.move_to_end(key)
+        else:
+            self.chunks[key] = self.generate_chunk(ci, cj)
+            self.generated += 1
+            if len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+                self.evicted += 1
+        return self.chunks[key]
+
+    def is_wall(self, i, j):
+        """
+        :param i: int, world cell index along x
+        :param j: int, world cell index along y
+        :return: True if cell (i, j) is a wall
+        """
+        size = self.chunk_size
+        cells = self.chunk(i // size, j // size)
+        return cells[(i % size) * size + j % size] == Maze.WALL_CELL
+
+    def chunks_near(self, rect, margin=1):
+        """
+        find the chunks a rect in world space overlaps, and the ones around them
+        :param rect: pygame.Rect (or any object with x, y, width and height), position in world space
+        :param margin: int, number of chunks added on every side
+        :return: list of (ci, cj)
+        """
+        span = self.chunk_size * BLOCK_SIZE
+        first_ci = (rect.x - MAZE_ORIGIN) // span - margin
+        last_ci = (rect.x + rect.width - 1 - MAZE_ORIGIN) // span + margin
+        first_cj = (rect.y - MAZE_ORIGIN) // span - margin
+        last_cj = (rect.y + rect.height - 1 - MAZE_ORIGIN) // span + margin
+        return [(ci, cj) for ci in range(first_ci, last_ci + 1) for cj in range(first_cj, last_cj + 1)]
+
+    def prefetch(self, rect, margin=1):
+        """
+        generate the chunks near a rect before they show up on screen, and mark them as recently used
+        :param rect: pygame.Rect (or any object with x, y, width and height), position in world space
+        :param margin: int, number of chunks added on every side
+        :return: None
+        """
+        for ci, cj in self.chunks_near(rect, margin):
+            self.chunk(ci, cj)
+
+
+class WorldWallIndex(TileIndex):
+    """
+    the walls of a ChunkedWorld, looked up like a TileIndex of wall rects, nothing is registered on it
+    """
+
+    def __init__(self, world):
+        """
+        :param world: ChunkedWorld
+        """
+        super().__init__(MAZE_ORIGIN, BLOCK_SIZE)
+        self.world = world
+
+    def occupied(self, i, j):
+        """
+        :param i: int, world cell index along x
+        :param j: int, world cell index along y
+        :return: True if cell (i, j) is a wall
+        """
+        return self.world.is_wall(i, j)
+
+    def query(self, rect):
+        """
+        :param rect: pygame.Rect (or any object with x, y, width and height), position in world space
+        :return: list of Rect, the walls on the tiles rect overlaps
+        """
+        return [Rect(i * BLOCK_SIZE + MAZE_ORIGIN, j * BLOCK_SIZE + MAZE_ORIGIN, BLOCK_SIZE, BLOCK_SIZE)
+                for i, j in self.cells_overlapping(rect) if self.world.is_wall(i, j)]
+
+
+class ExploreState(GameState):
+    """
+    a round of the exploration mode: no treasures, no trapping walls and no countdown, only an endless maze
+    """
+
+    def __init__(self, world):
+        """
+        :param world: ChunkedWorld
+        """
+        self.world = world
+        # an empty maze stands for the world, GameState only reads its seed
+        super().__init__(Maze.from_grid(0, bytearray(), world.seed))
+        # no countdown, so no times up warning
+        self.times_up_sound_played = True
+
+    @property
+    def game_over(self):
+        return False
+
+    @property
+    def time_left(self):
+        return float("inf")
+
+    def init_maze(self):
+        """
+        the walls are looked up in the world instead of built up front
+        :return: None
+        """
+        self.wall_index = WorldWallIndex(self.world)
+
+    def distribute_treasures(self):
+        return []
+
+    def step(self, inputs):
+        """
+        advance by one frame, after making sure the chunks around the player are generated
+        :param inputs: Inputs, keys held down
+        :return: None
+        """
+        self.world.prefetch(self.player)
+        super().step(inputs)